@@ -1,12 +1,15 @@
 """A/B testing framework for experimentation."""
-import hashlib
 import logging
-from typing import Dict, Optional, List
-from datetime import datetime
+import math
+import threading
+import time
+from bisect import bisect_right
+from typing import Dict, Optional, List, Tuple
+from dataclasses import dataclass, field
+from datetime import timezone
 from collections import defaultdict
 
-import numpy as np
-from scipy import stats
+import xxhash
 
 from models import Experiment, ExperimentVariant, ExperimentMetrics
 from config import settings
@@ -15,14 +18,56 @@ from config import settings
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class _MetricsAccum:
+    """In-memory counters for a variant, converted to ExperimentMetrics on read."""
+
+    variant_id: str
+    total_requests: int = 0
+    total_tokens: int = 0
+    total_cost: float = 0.0
+    total_latency_ms: float = 0.0
+    latency_m2: float = 0.0
+    error_count: int = 0
+    user_satisfaction: Optional[float] = None
+    # Guards the counters so concurrent workers only contend on the same variant
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def snapshot(self) -> ExperimentMetrics:
+        """Build a consistent ExperimentMetrics view of the counters.
+
+        Returns:
+            ExperimentMetrics with the current counter values
+        """
+        with self.lock:
+            return ExperimentMetrics(
+                variant_id=self.variant_id,
+                total_requests=self.total_requests,
+                total_tokens=self.total_tokens,
+                total_cost=self.total_cost,
+                total_latency_ms=self.total_latency_ms,
+                latency_m2=self.latency_m2,
+                error_count=self.error_count,
+                user_satisfaction=self.user_satisfaction,
+            )
+
+
 class ABTestingManager:
     """Manages A/B testing experiments."""
 
     def __init__(self):
         """Initialize A/B testing manager."""
         self.experiments: Dict[str, Experiment] = {}
-        self.metrics: Dict[str, Dict[str, ExperimentMetrics]] = defaultdict(dict)
+        self.metrics: Dict[str, Dict[str, _MetricsAccum]] = defaultdict(dict)
+        # Running request total per experiment, guarded by a per-experiment lock
+        self._exp_totals: Dict[str, int] = defaultdict(int)
+        self._exp_total_locks: Dict[str, threading.Lock] = {}
+        # experiment_id -> (cumulative traffic thresholds, variants in the same order)
+        self._cdf: Dict[str, Tuple[List[float], List[ExperimentVariant]]] = {}
+        # experiment_id -> end date as Unix epoch seconds (inf if open-ended)
+        self._end_epochs: Dict[str, float] = {}
         self.salt = settings.ab_test_salt
+        self._salt_seed = xxhash.xxh3_64_intdigest(self.salt.encode())
 
     def create_experiment(self, experiment: Experiment) -> bool:
         """Create a new experiment.
@@ -34,8 +79,8 @@ class ABTestingManager:
             True if created successfully
         """
         # Validate traffic split
-        total_traffic = sum(experiment.traffic_split.values())
-        if not (0.99 <= total_traffic <= 1.01):
+        total_traffic = math.fsum(experiment.traffic_split.values())
+        if abs(total_traffic - 1.0) > 1e-6:
             logger.error(f"Invalid traffic split: {total_traffic}")
             return False
 
@@ -49,10 +94,30 @@ class ABTestingManager:
 
         self.experiments[experiment.experiment_id] = experiment
 
+        # Precompute cumulative traffic thresholds for assignment
+        thresholds = []
+        cumulative = 0.0
+        for variant in experiment.variants:
+            cumulative += experiment.traffic_split[variant.variant_id]
+            thresholds.append(cumulative)
+        self._cdf[experiment.experiment_id] = (thresholds, list(experiment.variants))
+
+        # Naive end dates are interpreted as UTC
+        end_date = experiment.end_date
+        if end_date is None:
+            self._end_epochs[experiment.experiment_id] = math.inf
+        else:
+            if end_date.tzinfo is None:
+                end_date = end_date.replace(tzinfo=timezone.utc)
+            self._end_epochs[experiment.experiment_id] = end_date.timestamp()
+
+        self._exp_totals[experiment.experiment_id] = 0
+        self._exp_total_locks[experiment.experiment_id] = threading.Lock()
+
         # Initialize metrics for each variant
         for variant in experiment.variants:
             self.metrics[experiment.experiment_id][variant.variant_id] = (
-                ExperimentMetrics(variant_id=variant.variant_id)
+                _MetricsAccum(variant_id=variant.variant_id)
             )
 
         logger.info(f"Created experiment: {experiment.experiment_id}")
@@ -81,27 +146,26 @@ class ABTestingManager:
             return None
 
         # Check date range
-        now = datetime.utcnow()
-        if experiment.end_date and now > experiment.end_date:
+        if time.time() > self._end_epochs[experiment_id]:
             logger.info(f"Experiment {experiment_id} has ended")
             return None
 
-        # Deterministic assignment using hash
-        hash_input = f"{experiment_id}:{user_id}:{self.salt}"
-        hash_value = hashlib.sha256(hash_input.encode()).hexdigest()
-        hash_int = int(hash_value[:16], 16)
-        random_value = (hash_int % 10000) / 10000.0  # 0.0 to 1.0
+        # Deterministic assignment using a fast non-cryptographic hash
+        hash_int = xxhash.xxh3_64_intdigest(
+            f"{experiment_id}:{user_id}".encode(), seed=self._salt_seed
+        )
+        random_value = (hash_int & 0xFFFFFFFF) / 4294967296.0  # 0.0 to 1.0
 
         # Assign based on traffic split
-        cumulative = 0.0
-        for variant in experiment.variants:
-            cumulative += experiment.traffic_split[variant.variant_id]
-            if random_value < cumulative:
-                logger.debug(
-                    f"User {user_id} assigned to variant {variant.variant_id} "
-                    f"in experiment {experiment_id}"
-                )
-                return variant
+        thresholds, variants = self._cdf[experiment_id]
+        idx = bisect_right(thresholds, random_value)
+        if idx < len(variants):
+            variant = variants[idx]
+            logger.debug(
+                f"User {user_id} assigned to variant {variant.variant_id} "
+                f"in experiment {experiment_id}"
+            )
+            return variant
 
         # Fallback to first variant
         return experiment.variants[0]
@@ -138,18 +202,21 @@ class ABTestingManager:
 
         metrics = self.metrics[experiment_id][variant_id]
 
-        # Update running averages
-        n = metrics.total_requests
-        metrics.total_requests += 1
-        metrics.total_tokens += tokens
-        metrics.total_cost += cost
-
-        # Update average latency (running average)
-        metrics.avg_latency_ms = (metrics.avg_latency_ms * n + latency_ms) / (n + 1)
-
-        # Update error rate (running average)
-        error_count = metrics.error_rate * n + (1 if error else 0)
-        metrics.error_rate = error_count / (n + 1)
+        # Update counters; averages are derived on read
+        with metrics.lock:
+            # Welford update of the squared deviations, using the mean before and after
+            n = metrics.total_requests
+            old_mean = metrics.total_latency_ms / n if n else 0.0
+            metrics.total_requests += 1
+            metrics.total_tokens += tokens
+            metrics.total_cost += cost
+            metrics.total_latency_ms += latency_ms
+            new_mean = metrics.total_latency_ms / metrics.total_requests
+            metrics.latency_m2 += (latency_ms - old_mean) * (latency_ms - new_mean)
+            if error:
+                metrics.error_count += 1
+        with self._exp_total_locks[experiment_id]:
+            self._exp_totals[experiment_id] += 1
 
     def record_satisfaction(
         self, experiment_id: str, variant_id: str, score: float
@@ -170,13 +237,14 @@ class ABTestingManager:
         metrics = self.metrics[experiment_id][variant_id]
 
         # Update running average
-        if metrics.user_satisfaction is None:
-            metrics.user_satisfaction = score
-        else:
-            n = metrics.total_requests
-            metrics.user_satisfaction = (
-                metrics.user_satisfaction * (n - 1) + score
-            ) / n
+        with metrics.lock:
+            if metrics.user_satisfaction is None:
+                metrics.user_satisfaction = score
+            else:
+                n = metrics.total_requests
+                metrics.user_satisfaction = (
+                    metrics.user_satisfaction * (n - 1) + score
+                ) / n
 
     def get_experiment_results(self, experiment_id: str) -> Dict:
         """Get results for an experiment.
@@ -200,7 +268,8 @@ class ABTestingManager:
             "variants": {},
         }
 
-        for variant_id, metrics in variant_metrics.items():
+        for variant_id, accum in variant_metrics.items():
+            metrics = accum.snapshot()
             results["variants"][variant_id] = {
                 "variant_id": variant_id,
                 "total_requests": metrics.total_requests,
@@ -233,19 +302,72 @@ class ABTestingManager:
         if experiment_id not in self.metrics:
             return {}
 
-        variant_metrics = self.metrics[experiment_id]
+        variant_metrics = {
+            variant_id: accum.snapshot()
+            for variant_id, accum in self.metrics[experiment_id].items()
+        }
         variants = list(variant_metrics.keys())
 
         if len(variants) < 2:
             return {"error": "Need at least 2 variants for comparison"}
 
+        # Imported lazily: numpy/scipy are only needed once results are requested
+        import numpy as np
+        from scipy import stats
+
         # Compare first variant (control) with others
         control_id = variants[0]
         control = variant_metrics[control_id]
 
+        # Gather per-variant counters so every comparison runs at once
+        ns = np.fromiter(
+            (m.total_requests for m in variant_metrics.values()),
+            dtype=np.int64,
+            count=len(variants),
+        )
+        errors = np.fromiter(
+            (m.error_count for m in variant_metrics.values()),
+            dtype=np.int64,
+            count=len(variants),
+        )
+        latency_sums = np.fromiter(
+            (m.total_latency_ms for m in variant_metrics.values()),
+            dtype=np.float64,
+            count=len(variants),
+        )
+        m2s = np.fromiter(
+            (m.latency_m2 for m in variant_metrics.values()),
+            dtype=np.float64,
+            count=len(variants),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ps = np.where(ns > 0, errors / ns, 0.0)
+            means = np.where(ns > 0, latency_sums / ns, 0.0)
+            variances = m2s / (ns - 1)
+        n1, n2 = ns[0], ns[1:]
+        p1, p2 = ps[0], ps[1:]
+
+        # Compare error rates using proportion z-test
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Pooled proportion
+            p_pool = (p1 * n1 + p2 * n2) / (n1 + n2)
+            se = np.sqrt(p_pool * (1 - p_pool) * (1 / n1 + 1 / n2))
+            z_scores = np.where(se > 0, (p1 - p2) / se, 0.0)
+        p_values = np.where(se > 0, 2 * stats.norm.sf(np.abs(z_scores)), 1.0)
+
+        # Compare latencies with Welch's t-test from the counter-derived mean/variance
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stds = np.sqrt(variances)
+            t_stats, t_p_values = stats.ttest_ind_from_stats(
+                means[0], stds[0], n1, means[1:], stds[1:], n2, equal_var=False
+            )
+        # Zero variance on both sides with equal means yields NaN
+        t_stats = np.nan_to_num(t_stats, nan=0.0)
+        t_p_values = np.nan_to_num(t_p_values, nan=1.0)
+
         analyses = {}
 
-        for variant_id in variants[1:]:
+        for i, variant_id in enumerate(variants[1:]):
             variant = variant_metrics[variant_id]
 
             # Minimum sample size check
@@ -256,39 +378,28 @@ class ABTestingManager:
                 }
                 continue
 
-            # Compare error rates using proportion z-test
-            n1, n2 = control.total_requests, variant.total_requests
-            p1, p2 = control.error_rate, variant.error_rate
+            z_score = float(z_scores[i])
+            p_value = float(p_values[i])
 
-            # Pooled proportion
-            p_pool = (p1 * n1 + p2 * n2) / (n1 + n2)
-            se = np.sqrt(p_pool * (1 - p_pool) * (1 / n1 + 1 / n2))
-
-            if se > 0:
-                z_score = (p1 - p2) / se
-                p_value = 2 * (1 - stats.norm.cdf(abs(z_score)))
-            else:
-                z_score = 0
-                p_value = 1.0
-
-            # Compare latency using t-test (simplified, assumes normal distribution)
-            # In production, you'd store individual latencies
-            latency_significant = abs(control.avg_latency_ms - variant.avg_latency_ms) > 50
+            t_stat = float(t_stats[i])
+            latency_p_value = float(t_p_values[i])
 
             analyses[f"{control_id}_vs_{variant_id}"] = {
                 "sufficient_data": True,
                 "error_rate_comparison": {
-                    "control_error_rate": p1,
-                    "variant_error_rate": p2,
-                    "z_score": float(z_score),
-                    "p_value": float(p_value),
+                    "control_error_rate": control.error_rate,
+                    "variant_error_rate": variant.error_rate,
+                    "z_score": z_score,
+                    "p_value": p_value,
                     "significant": p_value < 0.05,
                 },
                 "latency_comparison": {
                     "control_latency_ms": control.avg_latency_ms,
                     "variant_latency_ms": variant.avg_latency_ms,
                     "difference_ms": variant.avg_latency_ms - control.avg_latency_ms,
-                    "practically_significant": latency_significant,
+                    "t_statistic": t_stat,
+                    "p_value": latency_p_value,
+                    "significant": latency_p_value < 0.05,
                 },
                 "cost_comparison": {
                     "control_cost_per_request": (
@@ -315,21 +426,24 @@ class ABTestingManager:
         Returns:
             Variant ID of winner or None
         """
-        results = self.get_experiment_results(experiment_id)
-
-        if "error" in results:
+        if experiment_id not in self.experiments:
             return None
 
-        # Simple scoring: lower error rate, lower latency, higher satisfaction
+        # Simple scoring: lower error rate, lower latency, higher satisfaction.
+        # Scored straight from the raw counters; no significance analysis needed.
         best_variant = None
         best_score = float("-inf")
 
-        for variant_id, metrics in results["variants"].items():
+        for variant_id, metrics in self.metrics[experiment_id].items():
+            n = metrics.total_requests
+            error_rate = metrics.error_count / n if n else 0.0
+            avg_latency_ms = metrics.total_latency_ms / n if n else 0.0
+
             # Weighted score (adjust weights as needed)
             score = (
-                (1 - metrics["error_rate"]) * 0.4
-                + (1 - min(metrics["avg_latency_ms"] / 5000, 1)) * 0.3
-                + (metrics.get("user_satisfaction", 0.5) or 0.5) * 0.3
+                (1 - error_rate) * 0.4
+                + (1 - min(avg_latency_ms / 5000, 1)) * 0.3
+                + (metrics.user_satisfaction or 0.5) * 0.3
             )
 
             if score > best_score:
@@ -357,17 +471,13 @@ class ABTestingManager:
         summaries = []
 
         for exp_id, experiment in self.experiments.items():
-            total_requests = sum(
-                m.total_requests for m in self.metrics[exp_id].values()
-            )
-
             summaries.append(
                 {
                     "experiment_id": exp_id,
                     "name": experiment.name,
                     "is_active": experiment.is_active,
                     "num_variants": len(experiment.variants),
-                    "total_requests": total_requests,
+                    "total_requests": self._exp_totals[exp_id],
                     "start_date": experiment.start_date.isoformat(),
                     "end_date": (
                         experiment.end_date.isoformat() if experiment.end_date else None
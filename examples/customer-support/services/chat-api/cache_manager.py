@@ -1,42 +1,124 @@
 """Redis-based caching for prompt responses."""
-import json
-import hashlib
 import logging
-from typing import Optional
-from redis import Redis
+import struct
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import msgpack
+import xxhash
+from redis.asyncio import ConnectionPool, Redis
 from redis.exceptions import RedisError
 
-from models import ChatResponse
+from models import ChatResponse, Message, UsageStats
 from config import settings
 
 
 logger = logging.getLogger(__name__)
 
+# Length prefix for variable-size fields fed into the key hash
+_LEN = struct.Struct("<I")
+# (has_temperature, temperature, has_max_tokens, max_tokens)
+_PARAMS = struct.Struct("<?d?q")
+# (role length, content length) header written once per message
+_MESSAGE_HEADER = struct.Struct("<II")
+
+# Keys fetched per SCAN cursor step and deleted per pipeline flush
+SCAN_BATCH_SIZE = 1000
+
+# Shared by every CacheManager in the process; connections are opened lazily
+_pool = ConnectionPool(
+    host=settings.redis_host,
+    port=settings.redis_port,
+    db=settings.redis_db,
+    password=settings.redis_password,
+    decode_responses=False,
+    socket_connect_timeout=5,
+    max_connections=settings.redis_max_connections,
+)
+
+
+def _response_from_cache(data: dict) -> ChatResponse:
+    """Rebuild a ChatResponse from trusted cached data without validation.
+
+    Args:
+        data: Dict produced by ChatResponse.model_dump()
+
+    Returns:
+        ChatResponse marked as cached
+    """
+    # model_construct doesn't recurse, so nested models are built explicitly
+    data["message"] = Message.model_construct(**data["message"])
+    data["usage"] = UsageStats.model_construct(**data["usage"])
+    data["cached"] = True
+    return ChatResponse.model_construct(**data)
+
 
 class CacheManager:
-    """Manages prompt caching using Redis."""
+    """Manages prompt caching using Redis, fronted by an in-process LRU."""
 
     def __init__(self):
         """Initialize cache manager."""
+        # In-process L1: key -> (monotonic expiry, response with cached=True)
+        self._l1: "OrderedDict[str, Tuple[float, ChatResponse]]" = OrderedDict()
+        self._l1_max = settings.cache_l1_max_entries
+        self._l1_ttl = min(settings.cache_l1_ttl_seconds, settings.cache_ttl_seconds)
+
+        self.redis: Optional[Redis] = Redis(connection_pool=_pool)
+        self.enabled = settings.enable_prompt_caching
+        self.ttl = settings.cache_ttl_seconds
+
+    async def connect(self):
+        """Verify the Redis connection, disabling caching if it is unreachable."""
         try:
-            self.redis = Redis(
-                host=settings.redis_host,
-                port=settings.redis_port,
-                db=settings.redis_db,
-                password=settings.redis_password,
-                decode_responses=True,
-                socket_connect_timeout=5,
-            )
-            # Test connection
-            self.redis.ping()
-            self.enabled = settings.enable_prompt_caching
-            self.ttl = settings.cache_ttl_seconds
+            await self.redis.ping()
             logger.info("Cache manager initialized successfully")
         except RedisError as e:
             logger.warning(f"Redis connection failed: {e}. Caching disabled.")
             self.enabled = False
             self.redis = None
 
+    async def close(self):
+        """Release pooled Redis connections."""
+        await _pool.disconnect()
+
+    def _l1_get(self, key: str) -> Optional[ChatResponse]:
+        """Look up a response in the in-process cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Copy of the cached ChatResponse or None if absent or expired
+        """
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+
+        expires_at, response = entry
+        if time.monotonic() >= expires_at:
+            del self._l1[key]
+            return None
+
+        self._l1.move_to_end(key)
+        # Deep copy: nested message/usage models would otherwise be shared
+        return response.model_copy(deep=True)
+
+    def _l1_put(self, key: str, response: ChatResponse):
+        """Store a response in the in-process cache, evicting the oldest entry.
+
+        Args:
+            key: Cache key
+            response: Response to cache
+        """
+        self._l1[key] = (
+            time.monotonic() + self._l1_ttl,
+            response.model_copy(update={"cached": True}, deep=True),
+        )
+        self._l1.move_to_end(key)
+        if len(self._l1) > self._l1_max:
+            self._l1.popitem(last=False)
+
     def _generate_key(
         self,
         messages: list,
@@ -55,20 +137,33 @@ class CacheManager:
         Returns:
             Cache key hash
         """
-        # Create a stable representation of the request
-        cache_data = {
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
-            "model": model,
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-        }
-
-        # Generate hash
-        cache_str = json.dumps(cache_data, sort_keys=True)
-        cache_hash = hashlib.sha256(cache_str.encode()).hexdigest()
-        return f"llm_cache:{cache_hash}"
-
-    def get(
+        # Hash the raw request fields directly; every variable-size field is
+        # length-prefixed so distinct requests can't produce the same stream
+        h = xxhash.xxh3_128()
+        model_bytes = model.encode()
+        h.update(_LEN.pack(len(model_bytes)))
+        h.update(model_bytes)
+        h.update(
+            _PARAMS.pack(
+                temperature is not None,
+                temperature or 0.0,
+                max_tokens is not None,
+                max_tokens or 0,
+            )
+        )
+        # Walk the messages directly so no intermediate list is allocated
+        update = h.update
+        pack_header = _MESSAGE_HEADER.pack
+        for m in messages:
+            role = m.role.encode()
+            content = m.content.encode()
+            update(pack_header(len(role), len(content)))
+            update(role)
+            update(content)
+
+        return f"llm_cache:{h.hexdigest()}"
+
+    async def get(
         self,
         messages: list,
         model: str,
@@ -91,23 +186,76 @@ class CacheManager:
 
         try:
             key = self._generate_key(messages, model, temperature, max_tokens)
-            cached_data = self.redis.get(key)
+
+            response = self._l1_get(key)
+            if response is not None:
+                logger.debug(f"L1 cache hit for key: {key}")
+                return response
+
+            cached_data = await self.redis.get(key)
 
             if cached_data:
                 logger.info(f"Cache hit for key: {key}")
-                response_dict = json.loads(cached_data)
-                response = ChatResponse(**response_dict)
-                response.cached = True
+                response = _response_from_cache(msgpack.unpackb(cached_data, raw=False))
+                self._l1_put(key, response)
                 return response
 
             logger.debug(f"Cache miss for key: {key}")
             return None
 
-        except (RedisError, json.JSONDecodeError) as e:
+        except (RedisError, ValueError, KeyError, TypeError, msgpack.UnpackException) as e:
             logger.error(f"Cache retrieval error: {e}")
             return None
 
-    def set(
+    async def get_many(
+        self,
+        requests: Sequence[Tuple[list, str, float, Optional[int]]],
+    ) -> List[Optional[ChatResponse]]:
+        """Retrieve cached responses for several requests in one round trip.
+
+        Args:
+            requests: Sequence of (messages, model, temperature, max_tokens) tuples
+
+        Returns:
+            List of cached ChatResponse or None, in the same order as requests
+        """
+        results: List[Optional[ChatResponse]] = [None] * len(requests)
+        if not self.enabled or not self.redis or not requests:
+            return results
+
+        try:
+            keys = [self._generate_key(*request) for request in requests]
+
+            # Serve what we can from L1, then fetch the rest with a single MGET
+            missing = []
+            for i, key in enumerate(keys):
+                response = self._l1_get(key)
+                if response is not None:
+                    results[i] = response
+                else:
+                    missing.append(i)
+
+            if not missing:
+                return results
+
+            values = await self.redis.mget([keys[i] for i in missing])
+            for i, cached_data in zip(missing, values):
+                if cached_data:
+                    response = _response_from_cache(msgpack.unpackb(cached_data, raw=False))
+                    self._l1_put(keys[i], response)
+                    results[i] = response
+
+            logger.debug(
+                f"Batch cache lookup: {sum(r is not None for r in results)}/"
+                f"{len(requests)} hits"
+            )
+            return results
+
+        except (RedisError, ValueError, KeyError, TypeError, msgpack.UnpackException) as e:
+            logger.error(f"Cache batch retrieval error: {e}")
+            return [None] * len(requests)
+
+    async def set(
         self,
         messages: list,
         model: str,
@@ -132,11 +280,12 @@ class CacheManager:
 
         try:
             key = self._generate_key(messages, model, temperature, max_tokens)
-            # Convert response to dict for JSON serialization
+            # Convert response to dict for msgpack serialization
             response_dict = response.model_dump()
-            cache_data = json.dumps(response_dict)
+            cache_data = msgpack.packb(response_dict, use_bin_type=True)
 
-            self.redis.setex(key, self.ttl, cache_data)
+            await self.redis.setex(key, self.ttl, cache_data)
+            self._l1_put(key, response)
             logger.info(f"Cached response with key: {key}")
             return True
 
@@ -144,7 +293,7 @@ class CacheManager:
             logger.error(f"Cache storage error: {e}")
             return False
 
-    def invalidate(
+    async def invalidate(
         self,
         messages: list,
         model: str,
@@ -167,7 +316,8 @@ class CacheManager:
 
         try:
             key = self._generate_key(messages, model, temperature, max_tokens)
-            deleted = self.redis.delete(key)
+            self._l1.pop(key, None)
+            deleted = await self.redis.delete(key)
             logger.info(f"Invalidated cache key: {key}")
             return deleted > 0
 
@@ -175,7 +325,7 @@ class CacheManager:
             logger.error(f"Cache invalidation error: {e}")
             return False
 
-    def clear_all(self) -> bool:
+    async def clear_all(self) -> bool:
         """Clear all cached responses.
 
         Returns:
@@ -185,18 +335,27 @@ class CacheManager:
             return False
 
         try:
-            # Find all cache keys
-            keys = self.redis.keys("llm_cache:*")
-            if keys:
-                self.redis.delete(*keys)
-                logger.info(f"Cleared {len(keys)} cached responses")
+            self._l1.clear()
+
+            # Incrementally scan cache keys and delete them in pipelined batches
+            pipe = self.redis.pipeline(transaction=False)
+            count = 0
+            async for key in self.redis.scan_iter(match="llm_cache:*", count=SCAN_BATCH_SIZE):
+                pipe.delete(key)
+                count += 1
+                if count % SCAN_BATCH_SIZE == 0:
+                    await pipe.execute()
+            await pipe.execute()
+
+            if count:
+                logger.info(f"Cleared {count} cached responses")
             return True
 
         except RedisError as e:
             logger.error(f"Cache clear error: {e}")
             return False
 
-    def get_stats(self) -> dict:
+    async def get_stats(self) -> dict:
         """Get cache statistics.
 
         Returns:
@@ -206,12 +365,15 @@ class CacheManager:
             return {"enabled": False}
 
         try:
-            info = self.redis.info("stats")
-            keys = self.redis.keys("llm_cache:*")
+            info = await self.redis.info("stats")
+            # SCAN instead of KEYS so large caches don't block the server
+            total_keys = 0
+            async for _ in self.redis.scan_iter(match="llm_cache:*", count=SCAN_BATCH_SIZE):
+                total_keys += 1
 
             return {
                 "enabled": True,
-                "total_keys": len(keys),
+                "total_keys": total_keys,
                 "ttl_seconds": self.ttl,
                 "keyspace_hits": info.get("keyspace_hits", 0),
                 "keyspace_misses": info.get("keyspace_misses", 0),
@@ -17,6 +17,7 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_db: int = 0
     redis_password: Optional[str] = None
+    redis_max_connections: int = 64
 
     # Provider Configuration
     default_provider: str = "anthropic"
@@ -28,6 +29,8 @@ class Settings(BaseSettings):
     max_context_tokens: int = 100000
     auto_summarize_threshold: int = 80000
     cache_ttl_seconds: int = 3600
+    cache_l1_max_entries: int = 2048
+    cache_l1_ttl_seconds: int = 60
 
     # PII Detection
     enable_pii_detection: bool = True
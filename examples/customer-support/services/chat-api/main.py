@@ -49,6 +49,7 @@ async def lifespan(app: FastAPI):
     try:
         provider_manager = ProviderManager()
         cache_manager = CacheManager()
+        await cache_manager.connect()
         pii_detector = PIIDetector()
         cost_optimizer = CostOptimizer()
         ab_testing_manager = ABTestingManager()
@@ -64,6 +65,7 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down chat API...")
+    await cache_manager.close()
 
 
 app = FastAPI(
@@ -219,7 +221,7 @@ async def create_chat_completion(request: ChatRequest):
         # Check cache
         cached_response = None
         if settings.enable_prompt_caching and not request.stream:
-            cached_response = cache_manager.get(
+            cached_response = await cache_manager.get(
                 request.messages,
                 request.model or "",
                 request.temperature,
@@ -247,7 +249,7 @@ async def create_chat_completion(request: ChatRequest):
 
         # Cache response
         if settings.enable_prompt_caching:
-            cache_manager.set(
+            await cache_manager.set(
                 request.messages,
                 response.model,
                 request.temperature,
@@ -454,13 +456,13 @@ async def get_experiment_winner(experiment_id: str):
 @app.get("/cache/stats")
 async def get_cache_stats():
     """Get cache statistics."""
-    return cache_manager.get_stats()
+    return await cache_manager.get_stats()
 
 
 @app.post("/cache/clear")
 async def clear_cache():
     """Clear all cached responses."""
-    success = cache_manager.clear_all()
+    success = await cache_manager.clear_all()
     return {"success": success}
 
 
@@ -1,6 +1,6 @@
 """Data models for the chat API."""
 from typing import Optional, List, Dict, Any, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from datetime import datetime
 
 
@@ -103,10 +103,36 @@ class ExperimentMetrics(BaseModel):
     total_requests: int = 0
     total_tokens: int = 0
     total_cost: float = 0.0
-    avg_latency_ms: float = 0.0
-    error_rate: float = 0.0
+    total_latency_ms: float = 0.0
+    latency_m2: float = 0.0  # Sum of squared deviations from the mean (Welford)
+    error_count: int = 0
     user_satisfaction: Optional[float] = None
 
+    @computed_field
+    @property
+    def avg_latency_ms(self) -> float:
+        """Mean latency in milliseconds."""
+        if self.total_requests == 0:
+            return 0.0
+        return self.total_latency_ms / self.total_requests
+
+    @computed_field
+    @property
+    def latency_variance(self) -> float:
+        """Sample variance of latency in milliseconds squared."""
+        n = self.total_requests
+        if n < 2:
+            return 0.0
+        return self.latency_m2 / (n - 1)
+
+    @computed_field
+    @property
+    def error_rate(self) -> float:
+        """Fraction of requests that resulted in an error."""
+        if self.total_requests == 0:
+            return 0.0
+        return self.error_count / self.total_requests
+
 
 class CostOptimizationResult(BaseModel):
     """Result of cost optimization analysis."""
@@ -1,4 +1,7 @@
 """Tests for A/B testing framework."""
+import statistics
+import threading
+
 import pytest
 from datetime import datetime, timedelta
 
@@ -58,6 +61,26 @@ class TestABTesting:
         success = self.manager.create_experiment(experiment)
         assert not success
 
+    def test_create_experiment_many_way_split(self):
+        """Test that fractional splits summing to exactly 1 are accepted."""
+        experiment = self.create_test_experiment()
+        experiment.variants = [
+            ExperimentVariant(
+                variant_id=f"v{i}", name=f"Variant {i}", provider="openai", model="gpt-4"
+            )
+            for i in range(10)
+        ]
+        experiment.traffic_split = {f"v{i}": 0.1 for i in range(10)}
+
+        assert self.manager.create_experiment(experiment)
+
+    def test_create_experiment_slightly_off_split(self):
+        """Test that splits off by more than rounding error are rejected."""
+        experiment = self.create_test_experiment()
+        experiment.traffic_split = {"control": 0.5, "variant_a": 0.505}
+
+        assert not self.manager.create_experiment(experiment)
+
     def test_variant_assignment_deterministic(self):
         """Test that variant assignment is deterministic."""
         experiment = self.create_test_experiment()
@@ -91,6 +114,21 @@ class TestABTesting:
         control_ratio = assignments["control"] / num_users
         assert 0.4 <= control_ratio <= 0.6
 
+    def test_variant_assignment_uneven_split(self):
+        """Test that assignment honours a skewed traffic split."""
+        experiment = self.create_test_experiment()
+        experiment.traffic_split = {"control": 0.9, "variant_a": 0.1}
+        self.manager.create_experiment(experiment)
+
+        num_users = 1000
+        control_count = sum(
+            self.manager.assign_variant(experiment.experiment_id, f"user_{i}").variant_id
+            == "control"
+            for i in range(num_users)
+        )
+
+        assert 0.85 <= control_count / num_users <= 0.95
+
     def test_record_metrics(self):
         """Test recording metrics."""
         experiment = self.create_test_experiment()
@@ -106,7 +144,7 @@ class TestABTesting:
             error=False,
         )
 
-        metrics = self.manager.metrics[experiment.experiment_id]["control"]
+        metrics = self.manager.metrics[experiment.experiment_id]["control"].snapshot()
         assert metrics.total_requests == 1
         assert metrics.total_tokens == 100
         assert metrics.total_cost == 0.01
@@ -129,11 +167,60 @@ class TestABTesting:
                 error=False,
             )
 
-        metrics = self.manager.metrics[experiment.experiment_id]["control"]
+        metrics = self.manager.metrics[experiment.experiment_id]["control"].snapshot()
         assert metrics.total_requests == 5
         assert metrics.total_tokens == 500
         assert metrics.avg_latency_ms == 700  # Average of 500, 600, 700, 800, 900
 
+    def test_record_metrics_latency_variance(self):
+        """Test that latency variance is tracked without storing samples."""
+        experiment = self.create_test_experiment()
+        self.manager.create_experiment(experiment)
+
+        latencies = [500, 600, 700, 800, 900]
+        for latency in latencies:
+            self.manager.record_metrics(
+                experiment.experiment_id, "control", 100, 0.01, latency, False
+            )
+
+        metrics = self.manager.metrics[experiment.experiment_id]["control"].snapshot()
+        assert metrics.latency_variance == pytest.approx(statistics.variance(latencies))
+
+    def test_record_metrics_latency_variance_large_offset(self):
+        """Test that variance stays accurate for a small spread around a large mean."""
+        experiment = self.create_test_experiment()
+        self.manager.create_experiment(experiment)
+
+        latencies = [1e9 + x for x in (4.0, 7.0, 13.0, 16.0)]
+        for latency in latencies:
+            self.manager.record_metrics(
+                experiment.experiment_id, "control", 100, 0.01, latency, False
+            )
+
+        metrics = self.manager.metrics[experiment.experiment_id]["control"].snapshot()
+        assert metrics.latency_variance == pytest.approx(30.0)
+
+    def test_record_metrics_concurrent(self):
+        """Test that concurrent recording doesn't lose updates."""
+        experiment = self.create_test_experiment()
+        self.manager.create_experiment(experiment)
+
+        def record():
+            for _ in range(500):
+                self.manager.record_metrics(
+                    experiment.experiment_id, "control", 1, 0.001, 100, False
+                )
+
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = self.manager.metrics[experiment.experiment_id]["control"].snapshot()
+        assert metrics.total_requests == 4000
+        assert metrics.total_tokens == 4000
+
     def test_record_satisfaction(self):
         """Test recording satisfaction scores."""
         experiment = self.create_test_experiment()
@@ -156,7 +243,7 @@ class TestABTesting:
             score=0.8,
         )
 
-        metrics = self.manager.metrics[experiment.experiment_id]["control"]
+        metrics = self.manager.metrics[experiment.experiment_id]["control"].snapshot()
         assert metrics.user_satisfaction == 0.8
 
     def test_get_experiment_results(self):
@@ -200,6 +287,59 @@ class TestABTesting:
         assert "control_vs_variant_a" in analysis
         assert analysis["control_vs_variant_a"]["sufficient_data"]
 
+    def test_statistical_analysis_latency_t_test(self):
+        """Test latency comparison uses Welch's t-test."""
+        experiment = self.create_test_experiment()
+        self.manager.create_experiment(experiment)
+
+        for i in range(50):
+            self.manager.record_metrics(
+                experiment.experiment_id, "control", 100, 0.01, 500 + (i % 5) * 10
+            )
+            self.manager.record_metrics(
+                experiment.experiment_id, "variant_a", 100, 0.01, 400 + (i % 5) * 10
+            )
+
+        analysis = self.manager._analyze_significance(experiment.experiment_id)
+        latency = analysis["control_vs_variant_a"]["latency_comparison"]
+
+        assert latency["difference_ms"] == pytest.approx(-100)
+        assert latency["t_statistic"] > 0
+        assert latency["significant"]
+
+    def test_statistical_analysis_multiple_variants(self):
+        """Test that every variant is compared against the control."""
+        experiment = self.create_test_experiment()
+        experiment.variants.append(
+            ExperimentVariant(
+                variant_id="variant_b",
+                name="Variant B",
+                provider="openai",
+                model="gpt-3.5-turbo",
+            )
+        )
+        experiment.traffic_split = {"control": 0.4, "variant_a": 0.3, "variant_b": 0.3}
+        self.manager.create_experiment(experiment)
+
+        for i in range(50):
+            self.manager.record_metrics(
+                experiment.experiment_id, "control", 100, 0.01, 500, error=(i % 2 == 0)
+            )
+            self.manager.record_metrics(
+                experiment.experiment_id, "variant_a", 100, 0.01, 500, error=(i % 2 == 0)
+            )
+            self.manager.record_metrics(
+                experiment.experiment_id, "variant_b", 100, 0.01, 500, error=False
+            )
+
+        analysis = self.manager._analyze_significance(experiment.experiment_id)
+
+        same = analysis["control_vs_variant_a"]["error_rate_comparison"]
+        different = analysis["control_vs_variant_b"]["error_rate_comparison"]
+        assert same["z_score"] == 0
+        assert same["p_value"] == pytest.approx(1.0)
+        assert different["significant"]
+
     def test_get_winner(self):
         """Test determining winner."""
         experiment = self.create_test_experiment()
@@ -236,9 +376,15 @@ class TestABTesting:
         self.manager.create_experiment(experiment1)
         self.manager.create_experiment(experiment2)
 
+        self.manager.record_metrics(experiment1.experiment_id, "control", 100, 0.01, 500)
+        self.manager.record_metrics(experiment1.experiment_id, "variant_a", 100, 0.01, 500)
+
         experiments = self.manager.list_experiments()
         assert len(experiments) == 2
 
+        totals = {e["experiment_id"]: e["total_requests"] for e in experiments}
+        assert totals == {"test_exp_1": 2, "test_exp_2": 0}
+
     def test_inactive_experiment_no_assignment(self):
         """Test that inactive experiments don't assign variants."""
         experiment = self.create_test_experiment()
@@ -247,3 +393,21 @@ class TestABTesting:
 
         variant = self.manager.assign_variant(experiment.experiment_id, "user_123")
         assert variant is None
+
+    def test_ended_experiment_no_assignment(self):
+        """Test that experiments past their end date don't assign variants."""
+        experiment = self.create_test_experiment()
+        experiment.end_date = datetime.utcnow() - timedelta(hours=1)
+        self.manager.create_experiment(experiment)
+
+        variant = self.manager.assign_variant(experiment.experiment_id, "user_123")
+        assert variant is None
+
+    def test_future_end_date_assigns_variant(self):
+        """Test that experiments before their end date still assign variants."""
+        experiment = self.create_test_experiment()
+        experiment.end_date = datetime.utcnow() + timedelta(hours=1)
+        self.manager.create_experiment(experiment)
+
+        variant = self.manager.assign_variant(experiment.experiment_id, "user_123")
+        assert variant is not None
@@ -0,0 +1,247 @@
+"""Tests for the Redis-backed prompt cache."""
+import fakeredis
+import pytest
+from fakeredis.aioredis import FakeAsyncRedisConnection
+from redis.asyncio import ConnectionPool
+
+import cache_manager
+from cache_manager import SCAN_BATCH_SIZE, CacheManager
+from models import ChatResponse, Message, UsageStats
+
+
+MESSAGES = [
+    Message(role="system", content="You are a helpful assistant."),
+    Message(role="user", content="Where is my order?"),
+]
+
+
+def make_response(content: str = "It shipped yesterday.") -> ChatResponse:
+    """Build a ChatResponse as a provider would return it."""
+    return ChatResponse(
+        message=Message(role="assistant", content=content),
+        usage=UsageStats(
+            prompt_tokens=12,
+            completion_tokens=5,
+            total_tokens=17,
+            estimated_cost=0.00042,
+        ),
+        provider="openai",
+        model="gpt-4",
+        finish_reason="stop",
+    )
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Replace the shared connection pool with one backed by an in-memory server."""
+    fake_pool = ConnectionPool(
+        connection_class=FakeAsyncRedisConnection,
+        server=fakeredis.FakeServer(),
+    )
+    monkeypatch.setattr(cache_manager, "_pool", fake_pool)
+    return fake_pool
+
+
+@pytest.fixture
+def cache(pool):
+    """CacheManager connected to the fake Redis server."""
+    return CacheManager()
+
+
+@pytest.mark.asyncio
+class TestCacheManager:
+    """Tests for CacheManager."""
+
+    async def test_set_get_round_trip(self, cache):
+        """Test a stored response comes back equal and marked as cached."""
+        response = make_response()
+
+        assert await cache.set(MESSAGES, "gpt-4", 0.7, 256, response)
+        # Force the lookup through Redis rather than the in-process tier
+        cache._l1.clear()
+        cached = await cache.get(MESSAGES, "gpt-4", 0.7, 256)
+
+        assert cached is not None
+        assert cached.cached is True
+        assert cached.model_dump() == response.model_copy(update={"cached": True}).model_dump()
+
+    async def test_get_miss(self, cache):
+        """Test lookups differing in any parameter miss."""
+        await cache.set(MESSAGES, "gpt-4", 0.7, 256, make_response())
+
+        assert await cache.get(MESSAGES, "gpt-4", 0.7, None) is None
+        assert await cache.get(MESSAGES, "gpt-4", 0.2, 256) is None
+        assert await cache.get(MESSAGES[1:], "gpt-4", 0.7, 256) is None
+
+    async def test_invalidate(self, cache):
+        """Test invalidation removes the entry from both tiers."""
+        await cache.set(MESSAGES, "gpt-4", 0.7, 256, make_response())
+
+        assert await cache.invalidate(MESSAGES, "gpt-4", 0.7, 256)
+        assert await cache.get(MESSAGES, "gpt-4", 0.7, 256) is None
+        assert not await cache.invalidate(MESSAGES, "gpt-4", 0.7, 256)
+
+    async def test_clear_all_spans_pipeline_flushes(self, cache):
+        """Test clear_all deletes more keys than one pipeline flush holds."""
+        total = SCAN_BATCH_SIZE * 2 + 500
+        async with cache.redis.pipeline(transaction=False) as pipe:
+            for i in range(total):
+                pipe.set(f"llm_cache:{i}", b"x")
+            pipe.set("other:key", b"keep")
+            await pipe.execute()
+        await cache.set(MESSAGES, "gpt-4", 0.7, 256, make_response())
+
+        assert await cache.clear_all()
+
+        assert [k async for k in cache.redis.scan_iter(match="llm_cache:*")] == []
+        assert await cache.redis.get("other:key") == b"keep"
+        assert await cache.get(MESSAGES, "gpt-4", 0.7, 256) is None
+
+    async def test_get_stats(self, cache, monkeypatch):
+        """Test stats count only cache keys and report server hit counters."""
+        async def info(section):
+            # fakeredis does not implement INFO
+            assert section == "stats"
+            return {"keyspace_hits": 7, "keyspace_misses": 3}
+
+        monkeypatch.setattr(cache.redis, "info", info)
+        await cache.set(MESSAGES, "gpt-4", 0.7, 256, make_response())
+        await cache.set(MESSAGES, "gpt-3.5-turbo", 0.7, 256, make_response())
+        await cache.redis.set("other:key", b"x")
+
+        stats = await cache.get_stats()
+
+        assert stats == {
+            "enabled": True,
+            "total_keys": 2,
+            "ttl_seconds": cache.ttl,
+            "keyspace_hits": 7,
+            "keyspace_misses": 3,
+        }
+
+    async def test_disabled_cache_is_a_no_op(self, cache):
+        """Test a disabled cache neither stores nor returns responses."""
+        cache.enabled = False
+
+        assert not await cache.set(MESSAGES, "gpt-4", 0.7, 256, make_response())
+        assert await cache.get(MESSAGES, "gpt-4", 0.7, 256) is None
+        assert await cache.get_stats() == {"enabled": False}
+
+    async def test_close_disconnects_shared_pool(self, pool, cache):
+        """Test close() disconnects every connection in the shared pool."""
+        await cache.connect()
+        await cache.set(MESSAGES, "gpt-4", 0.7, 256, make_response())
+        connections = list(pool._available_connections) + list(pool._in_use_connections)
+        assert connections
+        assert all(c.is_connected for c in connections)
+
+        await cache.close()
+
+        assert not any(c.is_connected for c in connections)
+
+    async def test_get_many_preserves_order(self, cache):
+        """Test batched lookups mix L1 hits, Redis hits and misses in input order."""
+        await cache.set(MESSAGES, "gpt-4", 0.7, 256, make_response("from l1"))
+        await cache.set(MESSAGES, "gpt-3.5-turbo", 0.7, 256, make_response("from redis"))
+        # Leave only the gpt-4 entry in the in-process tier
+        redis_key = cache._generate_key(MESSAGES, "gpt-3.5-turbo", 0.7, 256)
+        del cache._l1[redis_key]
+
+        results = await cache.get_many([
+            (MESSAGES, "gpt-3.5-turbo", 0.7, 256),
+            (MESSAGES, "claude-3-haiku", 0.7, 256),
+            (MESSAGES, "gpt-4", 0.7, 256),
+        ])
+
+        assert [r.message.content if r else None for r in results] == [
+            "from redis",
+            None,
+            "from l1",
+        ]
+        assert all(r.cached for r in results if r is not None)
+        # Redis hits are promoted into L1
+        assert redis_key in cache._l1
+
+    async def test_get_many_all_l1_skips_redis(self, cache, monkeypatch):
+        """Test no MGET is issued when every key is served from L1."""
+        await cache.set(MESSAGES, "gpt-4", 0.7, 256, make_response())
+
+        async def mget(keys):
+            raise AssertionError("MGET should not be called")
+
+        monkeypatch.setattr(cache.redis, "mget", mget)
+        results = await cache.get_many([(MESSAGES, "gpt-4", 0.7, 256)])
+
+        assert results[0] is not None
+
+    async def test_get_many_empty(self, cache):
+        """Test an empty batch returns an empty list."""
+        assert await cache.get_many([]) == []
+
+
+class TestL1Cache:
+    """Tests for the in-process LRU tier."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Controllable replacement for time.monotonic."""
+        now = [1000.0]
+        monkeypatch.setattr(cache_manager.time, "monotonic", lambda: now[0])
+        return now
+
+    def test_entry_expires_after_ttl(self, cache, clock):
+        """Test entries are served until their TTL passes, then dropped."""
+        cache._l1_put("k", make_response())
+
+        clock[0] += cache._l1_ttl - 1
+        assert cache._l1_get("k") is not None
+
+        clock[0] += 1
+        assert cache._l1_get("k") is None
+        assert "k" not in cache._l1
+
+    def test_evicts_least_recently_used(self, pool, monkeypatch):
+        """Test the oldest unused entry is evicted at cache_l1_max_entries."""
+        monkeypatch.setattr(cache_manager.settings, "cache_l1_max_entries", 2)
+        cache = CacheManager()
+
+        cache._l1_put("a", make_response("a"))
+        cache._l1_put("b", make_response("b"))
+        # Touch "a" so "b" becomes the least recently used
+        assert cache._l1_get("a") is not None
+        cache._l1_put("c", make_response("c"))
+
+        assert list(cache._l1) == ["a", "c"]
+        assert cache._l1_get("b") is None
+
+    def test_get_returns_copy(self, cache):
+        """Test mutating a returned response does not change the cached entry."""
+        cache._l1_put("k", make_response("original"))
+
+        first = cache._l1_get("k")
+        first.finish_reason = "length"
+        first.message.content = "mutated"
+        first.usage.total_tokens = 0
+
+        second = cache._l1_get("k")
+        assert second.finish_reason == "stop"
+        assert second.message.content == "original"
+        assert second.usage.total_tokens == 17
+
+    def test_put_marks_cached_without_touching_original(self, cache):
+        """Test stored entries are marked cached while the caller's object is not."""
+        response = make_response()
+
+        cache._l1_put("k", response)
+
+        assert response.cached is False
+        assert cache._l1_get("k").cached is True
+
+    def test_put_is_isolated_from_caller_mutation(self, cache):
+        """Test mutating the stored response afterwards does not change the entry."""
+        response = make_response("original")
+        cache._l1_put("k", response)
+
+        response.message.content = "mutated"
+
+        assert cache._l1_get("k").message.content == "original"
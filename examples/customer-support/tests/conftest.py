@@ -1,12 +1,15 @@
 """Pytest configuration and fixtures for integration tests."""
 import pytest
+import pytest_asyncio
 import asyncio
 import httpx
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, Callable, Dict, Generator, Tuple
 import logging
 import os
 from datetime import datetime
 
+from utils import create_test_conversation
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -15,14 +18,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@pytest.fixture(scope='session')
-def event_loop():
-    """Create event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
 @pytest.fixture
 def test_user_id():
     """Generate test user ID."""
@@ -35,6 +30,59 @@ def test_session_id():
     return f"test_session_{int(datetime.now().timestamp())}"
 
 
+@pytest_asyncio.fixture(scope='session')
+async def http_client_factory() -> AsyncGenerator[Callable[..., httpx.AsyncClient], None]:
+    """Factory for session-wide API clients, one pooled client per base URL."""
+    clients: Dict[str, httpx.AsyncClient] = {}
+    limits = httpx.Limits(
+        max_keepalive_connections=50,
+        max_connections=100,
+        keepalive_expiry=60.0
+    )
+
+    def make(base_url: str, timeout: float = 30.0) -> httpx.AsyncClient:
+        if base_url not in clients:
+            clients[base_url] = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=timeout,
+                limits=limits,
+                http2=True
+            )
+        return clients[base_url]
+
+    yield make
+
+    await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+
+@pytest.fixture(scope='session')
+def http_clients(http_client_factory) -> Tuple[httpx.AsyncClient, httpx.AsyncClient]:
+    """Session-wide chat and KB API clients that reuse pooled connections."""
+    return (
+        http_client_factory("http://localhost:8000"),
+        http_client_factory("http://localhost:8001", timeout=60.0),
+    )
+
+
+@pytest.fixture
+def chat_client(http_clients) -> httpx.AsyncClient:
+    """Shared chat API client."""
+    return http_clients[0]
+
+
+@pytest.fixture
+def kb_client(http_clients) -> httpx.AsyncClient:
+    """Shared KB API client."""
+    return http_clients[1]
+
+
+@pytest_asyncio.fixture(scope='session')
+async def shared_conv_id(http_clients) -> str:
+    """Conversation created once per session for tests that don't need isolation."""
+    chat, _ = http_clients
+    return await create_test_conversation(chat, "Shared Test Conversation")
+
+
 @pytest.fixture
 async def chat_api_client() -> AsyncGenerator[httpx.AsyncClient, None]:
     """Fixture for chat API client."""
@@ -152,6 +200,14 @@ def setup_test_environment():
     logger.info("Tearing down test environment...")
 
 
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop shared with the fixtures."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
 # Pytest marks for test categorization
 def pytest_configure(config):
     """Register custom markers."""
@@ -18,7 +18,6 @@ class TestAnalyticsAPIBasic:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_analytics_health_check(self, analytics_client):
         """Test analytics API health endpoint."""
         response = await analytics_client.get("/health")
@@ -26,7 +25,6 @@ class TestAnalyticsAPIBasic:
         data = response.json()
         assert data.get("status") == "ok"
 
-    @pytest.mark.asyncio
     async def test_get_metrics_summary(self, analytics_client):
         """Test getting metrics summary."""
         response = await analytics_client.get("/v1/metrics/summary")
@@ -47,7 +45,6 @@ class TestAnalyticsConversationMetrics:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_conversation_metrics(self, analytics_client):
         """Test retrieving conversation metrics."""
         response = await analytics_client.get("/v1/metrics/conversations")
@@ -55,7 +52,6 @@ class TestAnalyticsConversationMetrics:
         data = response.json()
         assert "conversations" in data or "metrics" in data
 
-    @pytest.mark.asyncio
     async def test_conversation_metrics_with_filters(self, analytics_client):
         """Test conversation metrics with date filters."""
         end_date = datetime.now()
@@ -73,7 +69,6 @@ class TestAnalyticsConversationMetrics:
         )
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
     async def test_conversation_count(self, analytics_client):
         """Test getting conversation count."""
         response = await analytics_client.get("/v1/metrics/conversations/count")
@@ -81,7 +76,6 @@ class TestAnalyticsConversationMetrics:
         data = response.json()
         assert "count" in data or "total" in data
 
-    @pytest.mark.asyncio
     async def test_average_response_time(self, analytics_client):
         """Test getting average response time."""
         response = await analytics_client.get(
@@ -89,7 +83,6 @@ class TestAnalyticsConversationMetrics:
         )
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
     async def test_user_engagement_metrics(self, analytics_client):
         """Test user engagement metrics."""
         response = await analytics_client.get("/v1/metrics/engagement")
@@ -108,7 +101,6 @@ class TestAnalyticsCostMetrics:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_cost_analysis(self, analytics_client):
         """Test cost analysis endpoint."""
         response = await analytics_client.get("/v1/metrics/costs")
@@ -116,7 +108,6 @@ class TestAnalyticsCostMetrics:
         data = response.json()
         assert "costs" in data or "total_cost" in data
 
-    @pytest.mark.asyncio
     async def test_cost_by_provider(self, analytics_client):
         """Test cost breakdown by provider."""
         response = await analytics_client.get("/v1/metrics/costs/by-provider")
@@ -125,13 +116,11 @@ class TestAnalyticsCostMetrics:
         # Should have cost information
         assert isinstance(data, (dict, list))
 
-    @pytest.mark.asyncio
     async def test_cost_by_model(self, analytics_client):
         """Test cost breakdown by model."""
         response = await analytics_client.get("/v1/metrics/costs/by-model")
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
     async def test_cost_forecast(self, analytics_client):
         """Test cost forecasting."""
         params = {
@@ -143,7 +132,6 @@ class TestAnalyticsCostMetrics:
         )
         assert response.status_code in [200, 404]  # May not be implemented
 
-    @pytest.mark.asyncio
     async def test_cost_trends(self, analytics_client):
         """Test cost trends over time."""
         end_date = datetime.now()
@@ -174,7 +162,6 @@ class TestAnalyticsPerformanceMetrics:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_performance_summary(self, analytics_client):
         """Test performance metrics summary."""
         response = await analytics_client.get("/v1/metrics/performance")
@@ -183,7 +170,6 @@ class TestAnalyticsPerformanceMetrics:
         # Should have performance data
         assert isinstance(data, dict)
 
-    @pytest.mark.asyncio
     async def test_latency_percentiles(self, analytics_client):
         """Test latency percentile metrics."""
         response = await analytics_client.get(
@@ -191,19 +177,16 @@ class TestAnalyticsPerformanceMetrics:
         )
         assert response.status_code in [200, 404]
 
-    @pytest.mark.asyncio
     async def test_throughput_metrics(self, analytics_client):
         """Test throughput metrics."""
         response = await analytics_client.get("/v1/metrics/performance/throughput")
         assert response.status_code in [200, 404]
 
-    @pytest.mark.asyncio
     async def test_error_rate(self, analytics_client):
         """Test error rate metrics."""
         response = await analytics_client.get("/v1/metrics/performance/error-rate")
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
     async def test_token_usage_metrics(self, analytics_client):
         """Test token usage metrics."""
         response = await analytics_client.get("/v1/metrics/performance/token-usage")
@@ -222,25 +205,21 @@ class TestAnalyticsLLMMetrics:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_llm_request_metrics(self, analytics_client):
         """Test LLM request metrics."""
         response = await analytics_client.get("/v1/metrics/llm/requests")
         assert response.status_code in [200, 404]
 
-    @pytest.mark.asyncio
     async def test_model_usage_distribution(self, analytics_client):
         """Test model usage distribution."""
         response = await analytics_client.get("/v1/metrics/llm/models")
         assert response.status_code in [200, 404]
 
-    @pytest.mark.asyncio
     async def test_prompt_metrics(self, analytics_client):
         """Test prompt-related metrics."""
         response = await analytics_client.get("/v1/metrics/llm/prompts")
         assert response.status_code in [200, 404]
 
-    @pytest.mark.asyncio
     async def test_quality_metrics(self, analytics_client):
         """Test quality metrics."""
         response = await analytics_client.get("/v1/metrics/llm/quality")
@@ -259,7 +238,6 @@ class TestAnalyticsAggregations:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_metrics_by_time_period(self, analytics_client):
         """Test metrics aggregated by time period."""
         params = {
@@ -272,19 +250,16 @@ class TestAnalyticsAggregations:
         )
         assert response.status_code in [200, 404]
 
-    @pytest.mark.asyncio
     async def test_metrics_by_user(self, analytics_client):
         """Test metrics grouped by user."""
         response = await analytics_client.get("/v1/metrics/by-user")
         assert response.status_code in [200, 404]
 
-    @pytest.mark.asyncio
     async def test_metrics_by_endpoint(self, analytics_client):
         """Test metrics grouped by endpoint."""
         response = await analytics_client.get("/v1/metrics/by-endpoint")
         assert response.status_code in [200, 404]
 
-    @pytest.mark.asyncio
     async def test_comparison_metrics(self, analytics_client):
         """Test metrics comparison."""
         params = {
@@ -311,7 +286,6 @@ class TestAnalyticsErrors:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_invalid_date_range(self, analytics_client):
         """Test error with invalid date range."""
         params = {
@@ -324,7 +298,6 @@ class TestAnalyticsErrors:
         )
         assert response.status_code in [400, 422]
 
-    @pytest.mark.asyncio
     async def test_invalid_granularity(self, analytics_client):
         """Test error with invalid granularity."""
         params = {
@@ -336,7 +309,6 @@ class TestAnalyticsErrors:
         )
         assert response.status_code in [400, 404, 422]
 
-    @pytest.mark.asyncio
     async def test_nonexistent_metric(self, analytics_client):
         """Test error when requesting nonexistent metric."""
         response = await analytics_client.get("/v1/metrics/nonexistent")
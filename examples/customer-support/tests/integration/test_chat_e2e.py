@@ -22,7 +22,6 @@ class TestChatAPIBasic:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_health_check(self, chat_client):
         """Test chat API health endpoint."""
         response = await chat_client.get("/health")
@@ -31,7 +30,6 @@ class TestChatAPIBasic:
         assert data["status"] == "ok"
         assert "timestamp" in data
 
-    @pytest.mark.asyncio
     async def test_create_conversation(self, chat_client):
         """Test creating a new conversation."""
         payload = {
@@ -49,7 +47,6 @@ class TestChatAPIBasic:
         assert data["status"] == "active"
         return data["id"]
 
-    @pytest.mark.asyncio
     async def test_get_conversations(self, chat_client):
         """Test listing conversations."""
         response = await chat_client.get("/v1/conversations")
@@ -57,7 +54,6 @@ class TestChatAPIBasic:
         data = response.json()
         assert isinstance(data, list) or "conversations" in data
 
-    @pytest.mark.asyncio
     async def test_send_chat_message(self, chat_client):
         """Test sending a chat message."""
         # First create a conversation
@@ -81,7 +77,6 @@ class TestChatAPIBasic:
         data = response.json()
         assert "response" in data or "choices" in data
 
-    @pytest.mark.asyncio
     async def test_get_conversation_history(self, chat_client):
         """Test retrieving conversation history."""
         # Create conversation and add messages
@@ -98,13 +93,11 @@ class TestChatAPIBasic:
         assert data["id"] == conv_id
         assert "messages" in data or "conversation" in data
 
-    @pytest.mark.asyncio
     async def test_invalid_conversation_id(self, chat_client):
         """Test error handling for invalid conversation ID."""
         response = await chat_client.get("/v1/conversations/invalid_id_xyz")
         assert response.status_code in [404, 400]
 
-    @pytest.mark.asyncio
     async def test_chat_with_context(self, chat_client):
         """Test chat with knowledge base context."""
         conv_response = await chat_client.post(
@@ -142,7 +135,6 @@ class TestChatAPIAdvanced:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_streaming_response(self, chat_client):
         """Test streaming chat response."""
         conv_response = await chat_client.post(
@@ -176,7 +168,6 @@ class TestChatAPIAdvanced:
 
         assert len(chunks) > 0
 
-    @pytest.mark.asyncio
     async def test_multi_provider_fallback(self, chat_client):
         """Test multi-provider fallback mechanism."""
         conv_response = await chat_client.post(
@@ -202,7 +193,6 @@ class TestChatAPIAdvanced:
         if "provider" in data:
             assert data["provider"] in ["openai", "anthropic"]
 
-    @pytest.mark.asyncio
     async def test_rate_limiting(self, chat_client):
         """Test rate limiting functionality."""
         conv_response = await chat_client.post(
@@ -228,7 +218,6 @@ class TestChatAPIAdvanced:
         rate_limited = any(code == 429 for code in responses)
         assert len(responses) == 10
 
-    @pytest.mark.asyncio
     async def test_conversation_deletion(self, chat_client):
         """Test conversation deletion."""
         # Create conversation
@@ -246,7 +235,6 @@ class TestChatAPIAdvanced:
         get_response = await chat_client.get(f"/v1/conversations/{conv_id}")
         assert get_response.status_code in [404, 410]
 
-    @pytest.mark.asyncio
     async def test_conversation_metadata_update(self, chat_client):
         """Test updating conversation metadata."""
         conv_response = await chat_client.post(
@@ -291,7 +279,6 @@ class TestChatAPIErrors:
         ) as client:
             yield client
 
-    @pytest.mark.asyncio
     async def test_missing_required_field(self, chat_client):
         """Test error when required field is missing."""
         payload = {
@@ -304,7 +291,6 @@ class TestChatAPIErrors:
         )
         assert response.status_code in [400, 422]
 
-    @pytest.mark.asyncio
     async def test_invalid_provider(self, chat_client):
         """Test error when invalid provider is specified."""
         conv_response = await chat_client.post(
@@ -324,7 +310,6 @@ class TestChatAPIErrors:
         )
         assert response.status_code in [400, 422]
 
-    @pytest.mark.asyncio
     async def test_empty_message(self, chat_client):
         """Test error when message is empty."""
         conv_response = await chat_client.post(
@@ -343,7 +328,6 @@ class TestChatAPIErrors:
         )
         assert response.status_code in [400, 422]
 
-    @pytest.mark.asyncio
     async def test_message_size_limit(self, chat_client):
         """Test error when message exceeds size limit."""
         conv_response = await chat_client.post(
@@ -1,319 +1,197 @@
 """Integration tests for knowledge base API."""
+import asyncio
 import pytest
-import httpx
-from typing import AsyncGenerator
 import json
-import tempfile
-import os
-from pathlib import Path
+import orjson
+
+from utils import load_json, post_json, upload_file
+
+# Static search payloads, encoded once per process.
+_SEARCH_PAYLOAD = orjson.dumps({
+    "query": "test query",
+    "top_k": 5
+})
+
+_SEARCH_WITH_FILTERS_PAYLOAD = orjson.dumps({
+    "query": "customer support",
+    "top_k": 5,
+    "filters": {
+        "category": "faq",
+        "language": "en"
+    }
+})
+
+_SEMANTIC_SEARCH_PAYLOAD = orjson.dumps({
+    "query": "How to reset password",
+    "top_k": 5,
+    "search_type": "semantic"
+})
+
+_HYBRID_SEARCH_PAYLOAD = orjson.dumps({
+    "query": "login issues",
+    "top_k": 5,
+    "search_type": "hybrid",
+    "weights": {
+        "semantic": 0.7,
+        "keyword": 0.3
+    }
+})
+
+_METADATA_FILTER_PAYLOAD = orjson.dumps({
+    "query": "billing",
+    "top_k": 5,
+    "filters": {
+        "category": ["billing", "payments"],
+        "language": "en"
+    }
+})
+
+_RANKED_SEARCH_PAYLOAD = orjson.dumps({
+    "query": "account",
+    "top_k": 10,
+    "ranking": "relevance"
+})
 
 
 class TestKBAPIBasic:
     """Basic knowledge base API tests."""
 
-    @pytest.fixture
-    async def kb_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for KB API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8001",
-            timeout=30.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
     async def test_kb_health_check(self, kb_client):
         """Test KB API health endpoint."""
         response = await kb_client.get("/health")
         assert response.status_code == 200
-        data = response.json()
+        data = load_json(response)
         assert data.get("status") == "ok"
 
-    @pytest.mark.asyncio
     async def test_list_documents(self, kb_client):
         """Test listing documents."""
         response = await kb_client.get("/v1/documents")
         assert response.status_code == 200
-        data = response.json()
+        data = load_json(response)
         assert isinstance(data, list) or "documents" in data
 
-    @pytest.mark.asyncio
     async def test_search_empty_query(self, kb_client):
         """Test search with empty knowledge base."""
-        payload = {
-            "query": "test query",
-            "top_k": 5
-        }
-        response = await kb_client.post("/v1/search", json=payload)
+        response = await post_json(kb_client, "/v1/search", _SEARCH_PAYLOAD)
         assert response.status_code == 200
-        data = response.json()
+        data = load_json(response)
         assert "results" in data or isinstance(data, list)
 
-    @pytest.mark.asyncio
     async def test_search_with_filters(self, kb_client):
         """Test search with metadata filters."""
-        payload = {
-            "query": "customer support",
-            "top_k": 5,
-            "filters": {
-                "category": "faq",
-                "language": "en"
-            }
-        }
-        response = await kb_client.post("/v1/search", json=payload)
+        response = await post_json(kb_client, "/v1/search", _SEARCH_WITH_FILTERS_PAYLOAD)
         assert response.status_code == 200
 
 
 class TestKBAPIDocumentOperations:
     """Document upload and management tests."""
 
-    @pytest.fixture
-    async def kb_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for KB API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8001",
-            timeout=60.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
     async def test_upload_text_document(self, kb_client):
         """Test uploading a text document."""
-        with tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.txt',
-            delete=False
-        ) as f:
-            f.write("This is a test document about customer support.")
-            temp_path = f.name
-
-        try:
-            with open(temp_path, 'rb') as f:
-                files = {
-                    'file': ('test.txt', f, 'text/plain'),
-                }
-                data = {
-                    'metadata': json.dumps({
-                        'category': 'faq',
-                        'language': 'en'
-                    })
-                }
-                response = await kb_client.post(
-                    "/v1/documents",
-                    files=files,
-                    data=data
-                )
-            assert response.status_code in [200, 201]
-            result = response.json()
-            assert "id" in result or "document_id" in result
-        finally:
-            os.unlink(temp_path)
+        data = {
+            'metadata': json.dumps({
+                'category': 'faq',
+                'language': 'en'
+            })
+        }
+        response = await upload_file(
+            kb_client,
+            'test.txt',
+            "This is a test document about customer support.",
+            data=data
+        )
+        assert response.status_code in [200, 201]
+        result = load_json(response)
+        assert "id" in result or "document_id" in result
 
-    @pytest.mark.asyncio
     async def test_upload_multiple_documents(self, kb_client):
         """Test uploading multiple documents."""
-        results = []
+        # Upload all documents concurrently
+        responses = await asyncio.gather(*(
+            upload_file(kb_client, f'test_{i}.txt', f"Document {i}: This is test content.")
+            for i in range(3)
+        ))
 
-        for i in range(3):
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                suffix='.txt',
-                delete=False
-            ) as f:
-                f.write(f"Document {i}: This is test content.")
-                temp_path = f.name
-
-            try:
-                with open(temp_path, 'rb') as f:
-                    files = {
-                        'file': (f'test_{i}.txt', f, 'text/plain'),
-                    }
-                    response = await kb_client.post(
-                        "/v1/documents",
-                        files=files
-                    )
-                assert response.status_code in [200, 201]
-                results.append(response.json())
-            finally:
-                os.unlink(temp_path)
+        results = []
+        for response in responses:
+            assert response.status_code in [200, 201]
+            results.append(load_json(response))
 
         assert len(results) == 3
 
-    @pytest.mark.asyncio
     async def test_get_document(self, kb_client):
         """Test retrieving document details."""
         # First upload a document
-        with tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.txt',
-            delete=False
-        ) as f:
-            f.write("Test document content")
-            temp_path = f.name
-
-        try:
-            with open(temp_path, 'rb') as f:
-                files = {
-                    'file': ('test.txt', f, 'text/plain'),
-                }
-                upload_response = await kb_client.post(
-                    "/v1/documents",
-                    files=files
-                )
-            assert upload_response.status_code in [200, 201]
-            doc_id = upload_response.json().get("id") or upload_response.json().get("document_id")
-
-            # Get document
-            if doc_id:
-                response = await kb_client.get(f"/v1/documents/{doc_id}")
-                assert response.status_code == 200
-                data = response.json()
-                assert "id" in data or "document_id" in data
-        finally:
-            os.unlink(temp_path)
-
-    @pytest.mark.asyncio
+        upload_response = await upload_file(kb_client, 'test.txt', "Test document content")
+        assert upload_response.status_code in [200, 201]
+        body = load_json(upload_response)
+        doc_id = body.get("id") or body.get("document_id")
+        if not doc_id:
+            pytest.skip("upload API returned no id")
+
+        # Get document
+        response = await kb_client.get(f"/v1/documents/{doc_id}")
+        assert response.status_code == 200
+        data = load_json(response)
+        assert "id" in data or "document_id" in data
+
     async def test_delete_document(self, kb_client):
         """Test deleting a document."""
         # Upload document
-        with tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.txt',
-            delete=False
-        ) as f:
-            f.write("Document to delete")
-            temp_path = f.name
-
-        try:
-            with open(temp_path, 'rb') as f:
-                files = {
-                    'file': ('delete_test.txt', f, 'text/plain'),
-                }
-                upload_response = await kb_client.post(
-                    "/v1/documents",
-                    files=files
-                )
-            assert upload_response.status_code in [200, 201]
-            doc_id = upload_response.json().get("id") or upload_response.json().get("document_id")
-
-            # Delete document
-            if doc_id:
-                response = await kb_client.delete(f"/v1/documents/{doc_id}")
-                assert response.status_code in [200, 204]
-        finally:
-            os.unlink(temp_path)
-
-    @pytest.mark.asyncio
+        upload_response = await upload_file(kb_client, 'delete_test.txt', "Document to delete")
+        assert upload_response.status_code in [200, 201]
+        body = load_json(upload_response)
+        doc_id = body.get("id") or body.get("document_id")
+        if not doc_id:
+            pytest.skip("upload API returned no id")
+
+        # Delete document
+        response = await kb_client.delete(f"/v1/documents/{doc_id}")
+        assert response.status_code in [200, 204]
+
     async def test_document_versioning(self, kb_client):
         """Test document versioning."""
-        with tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.txt',
-            delete=False
-        ) as f:
-            f.write("Version 1 content")
-            temp_path = f.name
-
-        try:
-            with open(temp_path, 'rb') as f:
-                files = {
-                    'file': ('versioned.txt', f, 'text/plain'),
-                }
-                upload_response = await kb_client.post(
-                    "/v1/documents",
-                    files=files
-                )
-            assert upload_response.status_code in [200, 201]
-            doc_id = upload_response.json().get("id") or upload_response.json().get("document_id")
-
-            # Update with new version
-            if doc_id:
-                with tempfile.NamedTemporaryFile(
-                    mode='w',
-                    suffix='.txt',
-                    delete=False
-                ) as f2:
-                    f2.write("Version 2 content")
-                    temp_path2 = f2.name
-
-                try:
-                    with open(temp_path2, 'rb') as f2:
-                        files = {
-                            'file': ('versioned.txt', f2, 'text/plain'),
-                        }
-                        update_response = await kb_client.put(
-                            f"/v1/documents/{doc_id}",
-                            files=files
-                        )
-                    assert update_response.status_code in [200, 204]
-                finally:
-                    os.unlink(temp_path2)
-        finally:
-            os.unlink(temp_path)
+        upload_response = await upload_file(kb_client, 'versioned.txt', "Version 1 content")
+        assert upload_response.status_code in [200, 201]
+        body = load_json(upload_response)
+        doc_id = body.get("id") or body.get("document_id")
+        if not doc_id:
+            pytest.skip("upload API returned no id")
+
+        # Update with new version
+        update_response = await upload_file(
+            kb_client,
+            'versioned.txt',
+            "Version 2 content",
+            method="PUT",
+            url=f"/v1/documents/{doc_id}"
+        )
+        assert update_response.status_code in [200, 204]
 
 
 class TestKBAPISearch:
     """Advanced search functionality tests."""
 
-    @pytest.fixture
-    async def kb_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for KB API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8001",
-            timeout=30.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
     async def test_semantic_search(self, kb_client):
         """Test semantic search capability."""
-        payload = {
-            "query": "How to reset password",
-            "top_k": 5,
-            "search_type": "semantic"
-        }
-        response = await kb_client.post("/v1/search", json=payload)
+        response = await post_json(kb_client, "/v1/search", _SEMANTIC_SEARCH_PAYLOAD)
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
     async def test_hybrid_search(self, kb_client):
         """Test hybrid search (semantic + keyword)."""
-        payload = {
-            "query": "login issues",
-            "top_k": 5,
-            "search_type": "hybrid",
-            "weights": {
-                "semantic": 0.7,
-                "keyword": 0.3
-            }
-        }
-        response = await kb_client.post("/v1/search", json=payload)
+        response = await post_json(kb_client, "/v1/search", _HYBRID_SEARCH_PAYLOAD)
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
     async def test_search_with_metadata_filtering(self, kb_client):
         """Test search with metadata filtering."""
-        payload = {
-            "query": "billing",
-            "top_k": 5,
-            "filters": {
-                "category": ["billing", "payments"],
-                "language": "en"
-            }
-        }
-        response = await kb_client.post("/v1/search", json=payload)
+        response = await post_json(kb_client, "/v1/search", _METADATA_FILTER_PAYLOAD)
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
     async def test_search_result_ranking(self, kb_client):
         """Test search result ranking and ordering."""
-        payload = {
-            "query": "account",
-            "top_k": 10,
-            "ranking": "relevance"
-        }
-        response = await kb_client.post("/v1/search", json=payload)
+        response = await post_json(kb_client, "/v1/search", _RANKED_SEARCH_PAYLOAD)
         assert response.status_code == 200
-        data = response.json()
+        data = load_json(response)
 
         # Verify results are properly ranked
         if "results" in data and data["results"]:
@@ -328,65 +206,33 @@ class TestKBAPISearch:
 class TestKBAPIErrors:
     """Error handling tests for KB API."""
 
-    @pytest.fixture
-    async def kb_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for KB API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8001",
-            timeout=30.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
-    async def test_invalid_search_query(self, kb_client):
-        """Test search with invalid query."""
-        payload = {
-            "query": "",
-            "top_k": 5
-        }
-        response = await kb_client.post("/v1/search", json=payload)
-        assert response.status_code in [400, 422]
-
-    @pytest.mark.asyncio
-    async def test_invalid_top_k(self, kb_client):
-        """Test search with invalid top_k."""
-        payload = {
-            "query": "test",
-            "top_k": -1
-        }
-        response = await kb_client.post("/v1/search", json=payload)
-        assert response.status_code in [400, 422]
+    @pytest.mark.parametrize(
+        "payload,expected",
+        [
+            pytest.param({"query": "", "top_k": 5}, (400, 422), id="empty_query"),
+            pytest.param({"query": "test", "top_k": -1}, (400, 422), id="negative_top_k"),
+        ]
+    )
+    async def test_invalid_search(self, kb_client, payload, expected):
+        """Test search with an invalid query or top_k."""
+        response = await post_json(kb_client, "/v1/search", payload)
+        assert response.status_code in expected
 
-    @pytest.mark.asyncio
     async def test_nonexistent_document(self, kb_client):
         """Test retrieving nonexistent document."""
         response = await kb_client.get("/v1/documents/nonexistent_id")
         assert response.status_code in [404, 400]
 
-    @pytest.mark.asyncio
     async def test_unsupported_file_type(self, kb_client):
         """Test uploading unsupported file type."""
-        with tempfile.NamedTemporaryFile(
-            mode='wb',
-            suffix='.xyz',
-            delete=False
-        ) as f:
-            f.write(b"Unsupported content")
-            temp_path = f.name
-
-        try:
-            with open(temp_path, 'rb') as f:
-                files = {
-                    'file': ('test.xyz', f, 'application/octet-stream'),
-                }
-                response = await kb_client.post(
-                    "/v1/documents",
-                    files=files
-                )
-            # Should either reject or handle gracefully
-            assert response.status_code in [200, 201, 400, 415, 422]
-        finally:
-            os.unlink(temp_path)
+        response = await upload_file(
+            kb_client,
+            'test.xyz',
+            b"Unsupported content",
+            'application/octet-stream'
+        )
+        # Should either reject or handle gracefully
+        assert response.status_code in [200, 201, 400, 415, 422]
 
 
 if __name__ == "__main__":
@@ -1,33 +1,23 @@
 """Integration tests for LLM Observatory integration."""
+import asyncio
 import pytest
-import httpx
-from typing import AsyncGenerator
 import json
+import time
 from datetime import datetime, timedelta
 
+from utils import assert_ok, call_provider, create_test_conversation, post_json
+
+pytestmark = pytest.mark.remote
+
+PROVIDERS = ("openai", "anthropic")
+
 
 class TestObservatoryIntegration:
     """LLM Observatory integration tests."""
 
-    @pytest.fixture
-    async def chat_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for chat API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8000",
-            timeout=30.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
-    async def test_observatory_request_tracking(self, chat_client):
+    async def test_observatory_request_tracking(self, chat_client, shared_conv_id):
         """Test that requests are tracked in Observatory."""
-        # Create conversation
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Observatory Test"}
-        )
-        assert conv_response.status_code == 201
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
         # Send message that should be tracked
         payload = {
@@ -37,31 +27,27 @@ class TestObservatoryIntegration:
             "track_in_observatory": True
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
-        assert response.status_code in [200, 201]
+        data = assert_ok(response)
 
         # Verify response has tracking information
-        data = response.json()
         assert "response" in data or "choices" in data
 
-    @pytest.mark.asyncio
     async def test_observatory_metadata_preservation(self, chat_client):
         """Test that metadata is preserved in Observatory."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={
-                "title": "Metadata Test",
-                "metadata": {
-                    "user_id": "user_123",
-                    "session_id": "session_456",
-                    "environment": "test"
-                }
+        conv_id = await create_test_conversation(
+            chat_client,
+            "Metadata Test",
+            metadata={
+                "user_id": "user_123",
+                "session_id": "session_456",
+                "environment": "test"
             }
         )
-        conv_id = conv_response.json()["id"]
 
         payload = {
             "conversation_id": conv_id,
@@ -72,20 +58,16 @@ class TestObservatoryIntegration:
             }
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
-        assert response.status_code in [200, 201]
+        assert_ok(response)
 
-    @pytest.mark.asyncio
-    async def test_observatory_cost_tracking(self, chat_client):
+    async def test_observatory_cost_tracking(self, chat_client, shared_conv_id):
         """Test cost tracking in Observatory."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Cost Tracking Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
         payload = {
             "conversation_id": conv_id,
@@ -93,26 +75,21 @@ class TestObservatoryIntegration:
             "provider": "openai"
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
-        assert response.status_code in [200, 201]
-        data = response.json()
+        data = assert_ok(response)
 
         # Cost information should be available
         if "cost" in data:
             assert isinstance(data["cost"], (int, float))
             assert data["cost"] >= 0
 
-    @pytest.mark.asyncio
-    async def test_observatory_token_tracking(self, chat_client):
+    async def test_observatory_token_tracking(self, chat_client, shared_conv_id):
         """Test token usage tracking in Observatory."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Token Tracking Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
         payload = {
             "conversation_id": conv_id,
@@ -120,12 +97,12 @@ class TestObservatoryIntegration:
             "track_tokens": True
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
-        assert response.status_code in [200, 201]
-        data = response.json()
+        data = assert_ok(response)
 
         # Token information should be available
         if "usage" in data:
@@ -135,14 +112,9 @@ class TestObservatoryIntegration:
             if "completion_tokens" in usage:
                 assert isinstance(usage["completion_tokens"], int)
 
-    @pytest.mark.asyncio
-    async def test_observatory_error_tracking(self, chat_client):
+    async def test_observatory_error_tracking(self, chat_client, shared_conv_id):
         """Test error tracking in Observatory."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Error Tracking Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
         # Send request with invalid provider to trigger error
         payload = {
@@ -151,9 +123,10 @@ class TestObservatoryIntegration:
             "provider": "invalid_provider"
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
 
         # Error should be tracked even if request fails
@@ -163,23 +136,9 @@ class TestObservatoryIntegration:
 class TestObservatoryMetricsCollection:
     """Tests for metrics collection and reporting."""
 
-    @pytest.fixture
-    async def chat_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for chat API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8000",
-            timeout=30.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
-    async def test_request_latency_tracking(self, chat_client):
+    async def test_request_latency_tracking(self, chat_client, shared_conv_id):
         """Test request latency tracking."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Latency Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
         payload = {
             "conversation_id": conv_id,
@@ -187,59 +146,35 @@ class TestObservatoryMetricsCollection:
         }
 
         # Measure actual latency
-        import time
         start_time = time.time()
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
         elapsed_time = time.time() - start_time
 
-        assert response.status_code in [200, 201]
+        data = assert_ok(response)
         assert elapsed_time >= 0
-
-        data = response.json()
         if "latency_ms" in data:
             assert data["latency_ms"] > 0
 
-    @pytest.mark.asyncio
-    async def test_multi_provider_comparison_tracking(self, chat_client):
+    async def test_multi_provider_comparison_tracking(self, chat_client, shared_conv_id):
         """Test tracking for multi-provider comparison."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Multi-Provider Comparison"}
-        )
-        conv_id = conv_response.json()["id"]
-
-        providers = ["openai", "anthropic"]
-        results = {}
-
-        for provider in providers:
-            payload = {
-                "conversation_id": conv_id,
-                "message": "Compare providers",
-                "provider": provider
-            }
-
-            response = await chat_client.post(
-                "/v1/chat/completions",
-                json=payload
-            )
+        conv_id = shared_conv_id
 
-            if response.status_code in [200, 201]:
-                results[provider] = response.json()
+        # Query all providers concurrently
+        responses = await asyncio.gather(*(
+            call_provider(chat_client, conv_id, p, "Compare providers") for p in PROVIDERS
+        ))
+        results = {p: d for p, d in zip(PROVIDERS, responses) if d is not None}
 
         # Should have attempted multiple providers
         assert len(results) >= 1
 
-    @pytest.mark.asyncio
-    async def test_quality_metrics_collection(self, chat_client):
+    async def test_quality_metrics_collection(self, chat_client, shared_conv_id):
         """Test quality metrics collection."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Quality Metrics Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
         payload = {
             "conversation_id": conv_id,
@@ -247,13 +182,12 @@ class TestObservatoryMetricsCollection:
             "collect_quality_metrics": True
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
-        assert response.status_code in [200, 201]
-
-        data = response.json()
+        data = assert_ok(response)
         # Quality metrics might be included
         if "quality_score" in data:
             assert 0 <= data["quality_score"] <= 1
@@ -262,23 +196,9 @@ class TestObservatoryMetricsCollection:
 class TestObservatoryMultiProviderTracking:
     """Tests for multi-provider scenario tracking."""
 
-    @pytest.fixture
-    async def chat_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for chat API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8000",
-            timeout=30.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
-    async def test_provider_fallback_tracking(self, chat_client):
+    async def test_provider_fallback_tracking(self, chat_client, shared_conv_id):
         """Test fallback provider selection tracking."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Fallback Tracking Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
         payload = {
             "conversation_id": conv_id,
@@ -288,75 +208,41 @@ class TestObservatoryMultiProviderTracking:
             "track_fallback": True
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
-        assert response.status_code in [200, 201]
-
-        data = response.json()
+        data = assert_ok(response)
         if "provider_used" in data:
             assert data["provider_used"] in ["openai", "anthropic"]
 
-    @pytest.mark.asyncio
-    async def test_cost_comparison_tracking(self, chat_client):
+    async def test_cost_comparison_tracking(self, chat_client, shared_conv_id):
         """Test cost comparison across providers."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Cost Comparison Test"}
-        )
-        conv_id = conv_response.json()["id"]
-
-        costs_by_provider = {}
-
-        for provider in ["openai", "anthropic"]:
-            payload = {
-                "conversation_id": conv_id,
-                "message": "Compare costs",
-                "provider": provider
-            }
-
-            response = await chat_client.post(
-                "/v1/chat/completions",
-                json=payload
-            )
-
-            if response.status_code in [200, 201]:
-                data = response.json()
-                if "cost" in data:
-                    costs_by_provider[provider] = data["cost"]
+        conv_id = shared_conv_id
+
+        # Query all providers concurrently
+        responses = await asyncio.gather(*(
+            call_provider(chat_client, conv_id, p, "Compare costs") for p in PROVIDERS
+        ))
+        costs_by_provider = {
+            p: d["cost"] for p, d in zip(PROVIDERS, responses) if d is not None and "cost" in d
+        }
 
         # Costs should be comparable (both non-negative)
         for cost in costs_by_provider.values():
             assert isinstance(cost, (int, float))
             assert cost >= 0
 
-    @pytest.mark.asyncio
-    async def test_performance_comparison_tracking(self, chat_client):
+    async def test_performance_comparison_tracking(self, chat_client, shared_conv_id):
         """Test performance metrics comparison."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Performance Comparison Test"}
-        )
-        conv_id = conv_response.json()["id"]
-
-        performance_data = {}
+        conv_id = shared_conv_id
 
-        for provider in ["openai", "anthropic"]:
-            payload = {
-                "conversation_id": conv_id,
-                "message": "Compare performance",
-                "provider": provider
-            }
-
-            response = await chat_client.post(
-                "/v1/chat/completions",
-                json=payload
-            )
-
-            if response.status_code in [200, 201]:
-                data = response.json()
-                performance_data[provider] = data
+        # Query all providers concurrently
+        responses = await asyncio.gather(*(
+            call_provider(chat_client, conv_id, p, "Compare performance") for p in PROVIDERS
+        ))
+        performance_data = {p: d for p, d in zip(PROVIDERS, responses) if d is not None}
 
         # Should have performance data for tracking
         assert len(performance_data) >= 1
@@ -365,46 +251,30 @@ class TestObservatoryMultiProviderTracking:
 class TestObservatoryReporting:
     """Tests for Observatory reporting and exports."""
 
-    @pytest.fixture
-    async def chat_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for chat API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8000",
-            timeout=30.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
-    async def test_request_export_format(self, chat_client):
+    async def test_request_export_format(self, chat_client, shared_conv_id):
         """Test that request data can be exported."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Export Format Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
         payload = {
             "conversation_id": conv_id,
             "message": "Test export format"
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
-        assert response.status_code in [200, 201]
+        data = assert_ok(response)
 
         # Check if response has exportable fields
-        data = response.json()
         assert isinstance(data, dict)
 
-    @pytest.mark.asyncio
     async def test_analytics_endpoint_availability(self, chat_client):
         """Test that analytics endpoint is available."""
         response = await chat_client.get("/v1/analytics/request-summary")
         assert response.status_code in [200, 404]  # May not be available
 
-    @pytest.mark.asyncio
     async def test_historical_data_access(self, chat_client):
         """Test access to historical tracking data."""
         # This would require Observatory API access
@@ -427,66 +297,46 @@ class TestObservatoryReporting:
 class TestObservatoryDataConsistency:
     """Tests for data consistency and integrity."""
 
-    @pytest.fixture
-    async def chat_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
-        """Create async HTTP client for chat API."""
-        async with httpx.AsyncClient(
-            base_url="http://localhost:8000",
-            timeout=30.0
-        ) as client:
-            yield client
-
-    @pytest.mark.asyncio
     async def test_conversation_id_consistency(self, chat_client):
         """Test that conversation IDs are consistent in tracking."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Consistency Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = await create_test_conversation(chat_client, "Consistency Test")
 
         payload = {
             "conversation_id": conv_id,
             "message": "Test consistency"
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
-        assert response.status_code in [200, 201]
-
-        data = response.json()
+        data = assert_ok(response)
         if "conversation_id" in data:
             assert data["conversation_id"] == conv_id
 
-    @pytest.mark.asyncio
-    async def test_timestamp_consistency(self, chat_client):
+    async def test_timestamp_consistency(self, chat_client, shared_conv_id):
         """Test that timestamps are properly tracked."""
-        conv_response = await chat_client.post(
-            "/v1/conversations",
-            json={"title": "Timestamp Test"}
-        )
-        conv_id = conv_response.json()["id"]
+        conv_id = shared_conv_id
 
-        before_request = datetime.now()
+        before_request = time.time()
 
         payload = {
             "conversation_id": conv_id,
             "message": "Test timestamps"
         }
 
-        response = await chat_client.post(
+        response = await post_json(
+            chat_client,
             "/v1/chat/completions",
-            json=payload
+            payload
         )
 
-        after_request = datetime.now()
-        assert response.status_code in [200, 201]
-
-        data = response.json()
-        if "timestamp" in data:
-            response_time = datetime.fromisoformat(data["timestamp"])
+        after_request = time.time()
+        data = assert_ok(response)
+        timestamp = data.get("timestamp")
+        if timestamp:
+            response_time = datetime.fromisoformat(timestamp).timestamp()
             assert before_request <= response_time <= after_request
 
 
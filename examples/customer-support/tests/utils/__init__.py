@@ -2,15 +2,25 @@
 from .test_helpers import (
     create_test_conversation,
     send_test_message,
+    call_provider,
     search_knowledge_base,
     get_conversation_history,
     create_test_document,
+    upload_file,
+    post_json,
+    load_json,
+    assert_ok,
 )
 
 __all__ = [
     'create_test_conversation',
     'send_test_message',
+    'call_provider',
     'search_knowledge_base',
     'get_conversation_history',
     'create_test_document',
+    'upload_file',
+    'post_json',
+    'load_json',
+    'assert_ok',
 ]
@@ -1,31 +1,82 @@
 """Helper functions for tests."""
+import io
+import os
 import httpx
-from typing import Optional, Dict, Any
+import orjson
+from typing import Optional, Dict, Any, Union
 import json
 
+_JSON_HEADERS = {"content-type": "application/json"}
+_OK = frozenset({200, 201})
+
+
+async def post_json(
+    client: httpx.AsyncClient,
+    url: str,
+    payload: Any,
+    **kwargs
+) -> httpx.Response:
+    """POST a JSON payload serialized with orjson.
+
+    ``payload`` may also be pre-encoded ``bytes``, which are sent as-is.
+    """
+    if not isinstance(payload, bytes):
+        payload = orjson.dumps(payload)
+    return await client.post(
+        url,
+        content=payload,
+        headers=_JSON_HEADERS,
+        **kwargs
+    )
+
+
+def load_json(response: httpx.Response) -> Any:
+    """Parse a JSON response body with orjson."""
+    return orjson.loads(response.content)
+
+
+def assert_ok(response: httpx.Response) -> Any:
+    """Assert a 200/201 status and return the parsed body."""
+    assert response.status_code in _OK, response.text
+    return load_json(response)
+
 
 async def create_test_conversation(
     client: httpx.AsyncClient,
     title: str = "Test Conversation",
     metadata: Optional[Dict[str, Any]] = None
-) -> Dict[str, Any]:
-    """Create a test conversation."""
+) -> str:
+    """Create a test conversation and return its id."""
     payload = {
         "title": title,
         "metadata": metadata or {}
     }
 
-    response = await client.post(
-        "/v1/conversations",
-        json=payload
-    )
+    response = await post_json(client, "/v1/conversations", payload)
 
     if response.status_code in [200, 201]:
-        return response.json()
+        return load_json(response)["id"]
     else:
         raise Exception(f"Failed to create conversation: {response.status_code}")
 
 
+async def call_provider(
+    client: httpx.AsyncClient,
+    conversation_id: str,
+    provider: str,
+    message: str
+) -> Optional[Dict[str, Any]]:
+    """Send a chat completion to one provider; return its body, or None on failure."""
+    response = await post_json(client, "/v1/chat/completions", {
+        "conversation_id": conversation_id,
+        "message": message,
+        "provider": provider
+    })
+    if response.status_code in _OK:
+        return load_json(response)
+    return None
+
+
 async def send_test_message(
     client: httpx.AsyncClient,
     conversation_id: str,
@@ -41,13 +92,10 @@ async def send_test_message(
         **kwargs
     }
 
-    response = await client.post(
-        "/v1/chat/completions",
-        json=payload
-    )
+    response = await post_json(client, "/v1/chat/completions", payload)
 
     if response.status_code in [200, 201]:
-        return response.json()
+        return load_json(response)
     else:
         raise Exception(f"Failed to send message: {response.status_code}")
 
@@ -60,7 +108,7 @@ async def get_conversation_history(
     response = await client.get(f"/v1/conversations/{conversation_id}")
 
     if response.status_code == 200:
-        return response.json()
+        return load_json(response)
     else:
         raise Exception(f"Failed to get conversation: {response.status_code}")
 
@@ -78,13 +126,10 @@ async def search_knowledge_base(
         **kwargs
     }
 
-    response = await client.post(
-        "/v1/search",
-        json=payload
-    )
+    response = await post_json(client, "/v1/search", payload)
 
     if response.status_code == 200:
-        return response.json()
+        return load_json(response)
     else:
         raise Exception(f"Failed to search: {response.status_code}")
 
@@ -111,11 +156,40 @@ async def create_test_document(
     )
 
     if response.status_code in [200, 201]:
-        return response.json()
+        return load_json(response)
     else:
         raise Exception(f"Failed to create document: {response.status_code}")
 
 
+async def upload_file(
+    client: httpx.AsyncClient,
+    name: str,
+    content: Union[str, bytes, os.PathLike],
+    mime: str = "text/plain",
+    method: str = "POST",
+    url: str = "/v1/documents",
+    **kwargs
+) -> httpx.Response:
+    """Upload content as a multipart file.
+
+    ``str``/``bytes`` are wrapped in memory; a path is opened and streamed
+    by httpx in chunks, so large files are never read whole.
+    """
+    if isinstance(content, os.PathLike):
+        with open(content, 'rb') as f:
+            files = {'file': (name, f, mime)}
+            return await client.request(method, url, files=files, **kwargs)
+
+    if isinstance(content, str):
+        content = content.encode()
+
+    files = {
+        'file': (name, io.BytesIO(content), mime),
+    }
+
+    return await client.request(method, url, files=files, **kwargs)
+
+
 class TestContextManager:
     """Context manager for test cleanup."""
 
@@ -145,9 +219,9 @@ class TestContextManager:
 
     async def create_conversation(self, **kwargs):
         """Create conversation and track for cleanup."""
-        conv = await create_test_conversation(self.client, **kwargs)
-        self.created_conversations.append(conv['id'])
-        return conv
+        conv_id = await create_test_conversation(self.client, **kwargs)
+        self.created_conversations.append(conv_id)
+        return conv_id
 
     async def create_document(self, **kwargs):
         """Create document and track for cleanup."""
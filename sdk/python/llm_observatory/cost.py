@@ -8,7 +8,8 @@ Maintains up-to-date pricing information for all major LLM providers
 and calculates costs based on token usage.
 """
 
-from typing import Optional, Dict, Tuple
+import functools
+from typing import Optional, Dict, Sequence, Tuple
 from dataclasses import dataclass
 
 
@@ -72,6 +73,7 @@ class PricingDatabase:
     def __init__(self):
         """Initialize pricing database with current pricing data."""
         self._prices: Dict[str, Pricing] = {}
+        self._version = 0  # Bumped on add_pricing to invalidate derived caches
         self._load_openai_pricing()
         self._load_anthropic_pricing()
         self._load_google_pricing()
@@ -103,6 +105,7 @@ class PricingDatabase:
     def add_pricing(self, pricing: Pricing) -> None:
         """Add custom pricing for a model."""
         self._prices[pricing.model] = pricing
+        self._version += 1
 
     def list_models(self) -> list[str]:
         """List all models with pricing data."""
@@ -270,6 +273,7 @@ class CostCalculator:
     def __init__(self):
         """Initialize cost calculator with pricing database."""
         self.db = PricingDatabase()
+        self._compare_cached = functools.lru_cache(maxsize=128)(self._compare_models)
 
     def calculate_cost(
         self,
@@ -339,22 +343,43 @@ class CostCalculator:
 
     def compare_models(
         self,
-        models: list[str],
+        models: Sequence[str],
         prompt_tokens: int,
         completion_tokens: int
     ) -> Dict[str, Optional[float]]:
         """
         Compare costs across multiple models.
 
+        Results are memoized per (models, prompt_tokens, completion_tokens)
+        and invalidated when custom pricing is added or ``db`` is replaced.
+
         Args:
-            models: List of model identifiers
+            models: Model identifiers
             prompt_tokens: Number of input tokens
             completion_tokens: Number of output tokens
 
         Returns:
             Dictionary mapping model names to costs (None if pricing not found)
         """
-        results = {}
-        for model in models:
-            results[model] = self.calculate_cost(model, prompt_tokens, completion_tokens)
-        return results
+        return dict(
+            self._compare_cached(
+                tuple(models), prompt_tokens, completion_tokens, self.db, self.db._version
+            )
+        )
+
+    def _compare_models(
+        self,
+        models: Tuple[str, ...],
+        prompt_tokens: int,
+        completion_tokens: int,
+        db: PricingDatabase,
+        db_version: int
+    ) -> Dict[str, Optional[float]]:
+        """Compute compare_models results against db; db_version only keys the cache."""
+        # Single pass with a bound lookup instead of calculate_cost per model
+        # db is part of the key (by identity) so swapping calc.db never serves stale costs
+        get_pricing = db.get_pricing
+        return {
+            model: pricing.calculate_cost(prompt_tokens, completion_tokens) if pricing else None
+            for model, pricing in zip(models, map(get_pricing, models))
+        }
@@ -0,0 +1,41 @@
+# Copyright 2025 LLM Observatory Contributors
+# SPDX-License-Identifier: Apache-2.0
+
+"""Shared fixtures for LLM Observatory SDK tests."""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock
+from llm_observatory.cost import CostCalculator, PricingDatabase
+from tests.stubs import SpanContext, noop
+
+
+@pytest.fixture(scope="session")
+def pricing_db():
+    """Read-only pricing database shared across the session.
+
+    Tests that add pricing must build their own ``PricingDatabase()``.
+    """
+    return PricingDatabase()
+
+
+@pytest.fixture(scope="session")
+def calc():
+    """Read-only cost calculator shared across the session."""
+    return CostCalculator()
+
+
+@pytest.fixture
+def mock_span(monkeypatch):
+    """Route ``tracing.get_tracer`` to a stub tracer and return its span."""
+    # Only set_attribute is asserted on; the rest of the span API is inert
+    span = SimpleNamespace(
+        set_attribute=Mock(),
+        set_status=noop,
+        record_exception=noop,
+        add_event=noop,
+        is_recording=lambda: True,
+    )
+    tracer = SimpleNamespace(start_as_current_span=lambda *args, **kwargs: SpanContext(span))
+    monkeypatch.setattr("llm_observatory.tracing.get_tracer", lambda: tracer)
+    return span
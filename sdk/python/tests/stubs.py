@@ -0,0 +1,73 @@
+# Copyright 2025 LLM Observatory Contributors
+# SPDX-License-Identifier: Apache-2.0
+
+"""Lightweight provider client stubs for instrumentation tests."""
+
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator, Optional
+
+
+def openai_stream(*args: Any, **kwargs: Any) -> Iterator[SimpleNamespace]:
+    """Streaming ``create`` yielding OpenAI chunks; the last carries usage."""
+    for content in ("Hello", " world"):
+        yield SimpleNamespace(
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=content))],
+            usage=None,
+        )
+    yield SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content="!"))],
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=20),
+    )
+
+
+def noop(*args: Any, **kwargs: Any) -> None:
+    """Stand-in ``create`` for tests that only check wrapping."""
+    return None
+
+
+def make_openai_stub(
+    create: Callable[..., Any],
+    legacy_create: Optional[Callable[..., Any]] = None,
+) -> SimpleNamespace:
+    """
+    Build an OpenAI-shaped client exposing ``chat.completions.create``.
+
+    Args:
+        create: Callable used as ``chat.completions.create``
+        legacy_create: Optional callable used as ``completions.create``
+
+    Returns:
+        Client stub
+    """
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    if legacy_create is not None:
+        client.completions = SimpleNamespace(create=legacy_create)
+    return client
+
+
+def make_anthropic_stub(create: Callable[..., Any]) -> SimpleNamespace:
+    """
+    Build an Anthropic-shaped client exposing ``messages.create``.
+
+    Args:
+        create: Callable used as ``messages.create``
+
+    Returns:
+        Client stub
+    """
+    return SimpleNamespace(messages=SimpleNamespace(create=create))
+
+
+class SpanContext:
+    """Context manager yielding a fixed span, standing in for ``start_as_current_span``."""
+
+    def __init__(self, span: Any):
+        self.span = span
+
+    def __enter__(self) -> Any:
+        return self.span
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
@@ -4,64 +4,68 @@
 """Tests for cost calculation module."""
 
 import pytest
+from pytest import approx
 from llm_observatory.cost import CostCalculator, PricingDatabase, Pricing
 
 
 class TestPricing:
     """Test Pricing dataclass."""
 
-    def test_calculate_cost(self):
+    @pytest.mark.parametrize(
+        "prompt_tokens,completion_tokens,expected",
+        [
+            # (1000/1000 * 0.03) + (500/1000 * 0.06) = 0.03 + 0.03 = 0.06
+            (1000, 500, 0.06),
+            (0, 1000, 0.06),
+            (0, 0, 0.0),
+        ],
+    )
+    def test_calculate_cost(self, prompt_tokens, completion_tokens, expected):
         """Test cost calculation."""
         pricing = Pricing("gpt-4", 0.03, 0.06)
-        cost = pricing.calculate_cost(1000, 500)
-        # (1000/1000 * 0.03) + (500/1000 * 0.06) = 0.03 + 0.03 = 0.06
-        assert abs(cost - 0.06) < 0.0001
+        cost = pricing.calculate_cost(prompt_tokens, completion_tokens)
+        assert cost == approx(expected, abs=1e-4)
 
     def test_calculate_cost_breakdown(self):
         """Test cost breakdown calculation."""
         pricing = Pricing("gpt-4", 0.03, 0.06)
-        prompt_cost, completion_cost, total = pricing.calculate_cost_breakdown(1000, 500)
-        assert abs(prompt_cost - 0.03) < 0.0001
-        assert abs(completion_cost - 0.03) < 0.0001
-        assert abs(total - 0.06) < 0.0001
+        breakdown = pricing.calculate_cost_breakdown(1000, 500)
+        assert breakdown == approx((0.03, 0.03, 0.06), abs=1e-4)
 
 
 class TestPricingDatabase:
     """Test PricingDatabase class."""
 
-    def test_get_pricing_openai(self):
-        """Test getting OpenAI pricing."""
-        db = PricingDatabase()
-        pricing = db.get_pricing("gpt-4")
-        assert pricing is not None
-        assert pricing.model == "gpt-4"
-        assert pricing.prompt_cost_per_1k == 0.03
-        assert pricing.completion_cost_per_1k == 0.06
-
-    def test_get_pricing_anthropic(self):
-        """Test getting Anthropic pricing."""
-        db = PricingDatabase()
-        pricing = db.get_pricing("claude-3-opus-20240229")
-        assert pricing is not None
-        assert pricing.model == "claude-3-opus-20240229"
-        assert pricing.prompt_cost_per_1k == 0.015
-
-    def test_get_pricing_unknown_model(self):
-        """Test getting pricing for unknown model."""
-        db = PricingDatabase()
-        pricing = db.get_pricing("unknown-model")
-        assert pricing is None
-
-    def test_has_pricing(self):
+    @pytest.mark.parametrize(
+        "model,expected_prompt,expected_completion",
+        [
+            ("gpt-4", 0.03, 0.06),
+            ("claude-3-opus-20240229", 0.015, 0.075),
+            ("unknown-model", None, None),
+        ],
+    )
+    def test_get_pricing(self, pricing_db, model, expected_prompt, expected_completion):
+        """Test pricing lookup for known and unknown models."""
+        pricing = pricing_db.get_pricing(model)
+        if expected_prompt is None:
+            assert pricing is None
+        else:
+            assert pricing is not None
+            assert pricing.model == model
+            assert pricing.prompt_cost_per_1k == expected_prompt
+            assert pricing.completion_cost_per_1k == expected_completion
+
+    @pytest.mark.parametrize(
+        "model,expected",
+        [("gpt-4", True), ("unknown-model", False)],
+    )
+    def test_has_pricing(self, pricing_db, model, expected):
         """Test checking if pricing exists."""
-        db = PricingDatabase()
-        assert db.has_pricing("gpt-4") is True
-        assert db.has_pricing("unknown-model") is False
+        assert pricing_db.has_pricing(model) is expected
 
-    def test_list_models(self):
+    def test_list_models(self, pricing_db):
         """Test listing all models."""
-        db = PricingDatabase()
-        models = db.list_models()
+        models = pricing_db.list_models()
         assert len(models) > 0
         assert "gpt-4" in models
         assert "claude-3-opus-20240229" in models
@@ -79,42 +83,34 @@ class TestPricingDatabase:
 class TestCostCalculator:
     """Test CostCalculator class."""
 
-    def test_calculate_cost(self):
+    def test_calculate_cost(self, calc):
         """Test cost calculation."""
-        calc = CostCalculator()
         cost = calc.calculate_cost("gpt-4", 1000, 500)
         assert cost is not None
-        assert abs(cost - 0.06) < 0.0001
+        assert cost == approx(0.06, abs=1e-4)
 
-    def test_calculate_cost_unknown_model(self):
+    def test_calculate_cost_unknown_model(self, calc):
         """Test cost calculation for unknown model."""
-        calc = CostCalculator()
         cost = calc.calculate_cost("unknown-model", 1000, 500)
         assert cost is None
 
-    def test_calculate_cost_breakdown(self):
+    def test_calculate_cost_breakdown(self, calc):
         """Test cost breakdown."""
-        calc = CostCalculator()
         breakdown = calc.calculate_cost_breakdown("gpt-4", 1000, 500)
         assert breakdown is not None
-        prompt_cost, completion_cost, total = breakdown
-        assert abs(prompt_cost - 0.03) < 0.0001
-        assert abs(completion_cost - 0.03) < 0.0001
-        assert abs(total - 0.06) < 0.0001
+        assert breakdown == approx((0.03, 0.03, 0.06), abs=1e-4)
 
-    def test_estimate_cost(self):
+    def test_estimate_cost(self, calc):
         """Test cost estimation."""
-        calc = CostCalculator()
         # Estimate with 1500 total tokens (70% prompt, 30% completion)
         cost = calc.estimate_cost("gpt-4", 1500, prompt_ratio=0.7)
         assert cost is not None
         # (1050/1000 * 0.03) + (450/1000 * 0.06) = 0.0315 + 0.027 = 0.0585
-        assert abs(cost - 0.0585) < 0.001
+        assert cost == approx(0.0585, abs=1e-3)
 
-    def test_compare_models(self):
+    def test_compare_models(self, calc):
         """Test model comparison."""
-        calc = CostCalculator()
-        models = ["gpt-4", "gpt-4o", "gpt-3.5-turbo"]
+        models = ("gpt-4", "gpt-4o", "gpt-3.5-turbo")
         results = calc.compare_models(models, 1000, 500)
         assert len(results) == 3
         assert "gpt-4" in results
@@ -123,6 +119,38 @@ class TestCostCalculator:
         # gpt-3.5-turbo should be cheaper than gpt-4
         assert results["gpt-3.5-turbo"] < results["gpt-4"]
 
+    def test_compare_models_unknown_model(self, calc):
+        """Test model comparison with a model lacking pricing."""
+        results = calc.compare_models(("gpt-4", "unknown-model"), 1000, 500)
+        assert results["unknown-model"] is None
+        assert results["gpt-4"] == calc.calculate_cost("gpt-4", 1000, 500)
+
+    def test_compare_models_cache_invalidated_by_add_pricing(self):
+        """Test memoized comparisons pick up newly added pricing."""
+        calc = CostCalculator()
+        models = ("gpt-4", "custom-model")
+        first = calc.compare_models(models, 1000, 500)
+        assert first["custom-model"] is None
+
+        # Mutating a returned result must not leak into the cache
+        first["gpt-4"] = -1.0
+        assert calc.compare_models(models, 1000, 500)["gpt-4"] > 0
+
+        calc.db.add_pricing(Pricing("custom-model", 0.01, 0.02))
+        assert calc.compare_models(models, 1000, 500)["custom-model"] == approx(0.02)
+
+    def test_compare_models_cache_invalidated_by_db_swap(self):
+        """Test memoized comparisons are not reused after replacing the database."""
+        calc = CostCalculator()
+        models = ("gpt-4",)
+        assert calc.compare_models(models, 1000, 500)["gpt-4"] == approx(0.06, abs=1e-4)
+
+        # A fresh database has the same version counter as the original
+        db = PricingDatabase()
+        db._prices["gpt-4"] = Pricing("gpt-4", 0.001, 0.002, "openai")
+        calc.db = db
+        assert calc.compare_models(models, 1000, 500)["gpt-4"] == approx(0.002)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -4,7 +4,7 @@
 """Integration tests for LLM Observatory SDK."""
 
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from types import SimpleNamespace
 from llm_observatory import (
     LLMObservatory,
     instrument_openai,
@@ -12,204 +12,127 @@ from llm_observatory import (
     CostCalculator,
     ContextWindowOptimizer,
 )
+from tests.stubs import make_anthropic_stub, make_openai_stub, noop, openai_stream
+
+
+# 41-message conversation that overflows a 1000-token window; built once.
+_CTX_MESSAGES = [{"role": "system", "content": "You are a helpful assistant."}] + [
+    message
+    for i in range(20)
+    for message in (
+        {"role": "user", "content": f"Question {i}" * 50},
+        {"role": "assistant", "content": f"Answer {i}" * 50},
+    )
+]
+
+
+def _raise_api_error(*args, **kwargs):
+    raise Exception("API Error")
+
+
+@pytest.fixture(scope="module")
+def observatory():
+    """Observatory shared by every test in this module."""
+    obs = LLMObservatory(
+        service_name="test-app",
+        otlp_endpoint=None,
+        auto_shutdown=False,
+    )
+    yield obs
+    obs.shutdown()
 
 
 class TestEndToEndOpenAI:
     """End-to-end tests with OpenAI instrumentation."""
 
-    @patch("llm_observatory.tracing.get_tracer")
-    def test_basic_openai_flow(self, mock_get_tracer):
+    def test_basic_openai_flow(self, mock_span, observatory):
         """Test basic OpenAI instrumentation flow."""
-        # Initialize observatory
-        observatory = LLMObservatory(
-            service_name="test-app",
-            otlp_endpoint=None,
-            auto_shutdown=False,
+        # Create stub response
+        mock_response = SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content="Hello! How can I help?"),
+                    finish_reason="stop",
+                )
+            ],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=8, total_tokens=18),
         )
 
-        try:
-            # Create mock OpenAI client
-            mock_client = Mock()
-            mock_client.chat = Mock()
-            mock_client.chat.completions = Mock()
-
-            # Create mock response
-            mock_response = Mock()
-            mock_response.choices = [Mock()]
-            mock_response.choices[0].message = Mock()
-            mock_response.choices[0].message.content = "Hello! How can I help?"
-            mock_response.choices[0].finish_reason = "stop"
-            mock_response.usage = Mock()
-            mock_response.usage.prompt_tokens = 10
-            mock_response.usage.completion_tokens = 8
-            mock_response.usage.total_tokens = 18
-
-            # Mock the create method
-            mock_client.chat.completions.create = Mock(return_value=mock_response)
-
-            # Mock tracer
-            mock_span = Mock()
-            mock_tracer = Mock()
-            mock_tracer.start_as_current_span = MagicMock()
-            mock_tracer.start_as_current_span.return_value.__enter__ = Mock(
-                return_value=mock_span
-            )
-            mock_tracer.start_as_current_span.return_value.__exit__ = Mock(
-                return_value=False
-            )
-            mock_get_tracer.return_value = mock_tracer
-
-            # Instrument client
-            instrument_openai(mock_client)
+        # Create stub OpenAI client returning it
+        mock_client = make_openai_stub(lambda *args, **kwargs: mock_response)
 
-            # Make a call
-            response = mock_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": "Hello"}],
-            )
+        # Instrument client
+        instrument_openai(mock_client)
 
-            # Verify response
-            assert response is not None
-            assert response.choices[0].message.content == "Hello! How can I help?"
+        # Make a call
+        response = mock_client.chat.completions.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": "Hello"}],
+        )
 
-            # Verify cost calculation
-            cost = observatory.cost_calculator.calculate_cost("gpt-4", 10, 8)
-            assert cost is not None
-            assert cost > 0
+        # Verify response
+        assert response is not None
+        assert response.choices[0].message.content == "Hello! How can I help?"
 
-        finally:
-            observatory.shutdown()
+        # Verify cost calculation
+        cost = observatory.cost_calculator.calculate_cost("gpt-4", 10, 8)
+        assert cost is not None
+        assert cost > 0
 
-    @patch("llm_observatory.tracing.get_tracer")
-    def test_openai_streaming_flow(self, mock_get_tracer):
+    def test_openai_streaming_flow(self, mock_span, observatory):
         """Test OpenAI streaming instrumentation flow."""
-        observatory = LLMObservatory(
-            service_name="test-app",
-            otlp_endpoint=None,
-            auto_shutdown=False,
-        )
-
-        try:
-            # Create mock client
-            mock_client = Mock()
-            mock_client.chat = Mock()
-            mock_client.chat.completions = Mock()
-
-            # Create mock streaming chunks
-            def create_chunk(content):
-                chunk = Mock()
-                chunk.choices = [Mock()]
-                chunk.choices[0].delta = Mock()
-                chunk.choices[0].delta.content = content
-                chunk.usage = None
-                return chunk
-
-            final_chunk = create_chunk("")
-            final_chunk.usage = Mock()
-            final_chunk.usage.prompt_tokens = 10
-            final_chunk.usage.completion_tokens = 15
-
-            mock_stream = [
-                create_chunk("Hello"),
-                create_chunk(" world"),
-                final_chunk,
-            ]
-
-            mock_client.chat.completions.create = Mock(return_value=iter(mock_stream))
-
-            # Mock tracer
-            mock_span = Mock()
-            mock_tracer = Mock()
-            mock_tracer.start_as_current_span = MagicMock()
-            mock_tracer.start_as_current_span.return_value.__enter__ = Mock(
-                return_value=mock_span
-            )
-            mock_tracer.start_as_current_span.return_value.__exit__ = Mock(
-                return_value=False
-            )
-            mock_get_tracer.return_value = mock_tracer
-
-            # Instrument client
-            instrument_openai(mock_client)
+        mock_client = make_openai_stub(openai_stream)
 
-            # Make streaming call
-            stream = mock_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": "Hello"}],
-                stream=True,
-            )
+        # Instrument client
+        instrument_openai(mock_client)
 
-            # Consume stream
-            chunks = list(stream)
-            assert len(chunks) == 3
+        # Make streaming call
+        stream = mock_client.chat.completions.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": "Hello"}],
+            stream=True,
+        )
 
-        finally:
-            observatory.shutdown()
+        # Consume stream
+        chunks = list(stream)
+        assert len(chunks) == 3
 
 
 class TestEndToEndAnthropic:
     """End-to-end tests with Anthropic instrumentation."""
 
-    @patch("llm_observatory.tracing.get_tracer")
-    def test_basic_anthropic_flow(self, mock_get_tracer):
+    def test_basic_anthropic_flow(self, mock_span, observatory):
         """Test basic Anthropic instrumentation flow."""
-        observatory = LLMObservatory(
-            service_name="test-app",
-            otlp_endpoint=None,
-            auto_shutdown=False,
+        # Create stub response
+        mock_response = SimpleNamespace(
+            content=[SimpleNamespace(text="Hello! I'm Claude.")],
+            stop_reason="end_turn",
+            usage=SimpleNamespace(input_tokens=10, output_tokens=8),
         )
 
-        try:
-            # Create mock Anthropic client
-            mock_client = Mock()
-            mock_client.messages = Mock()
-
-            # Create mock response
-            mock_response = Mock()
-            mock_response.content = [Mock()]
-            mock_response.content[0].text = "Hello! I'm Claude."
-            mock_response.stop_reason = "end_turn"
-            mock_response.usage = Mock()
-            mock_response.usage.input_tokens = 10
-            mock_response.usage.output_tokens = 8
-
-            mock_client.messages.create = Mock(return_value=mock_response)
-
-            # Mock tracer
-            mock_span = Mock()
-            mock_tracer = Mock()
-            mock_tracer.start_as_current_span = MagicMock()
-            mock_tracer.start_as_current_span.return_value.__enter__ = Mock(
-                return_value=mock_span
-            )
-            mock_tracer.start_as_current_span.return_value.__exit__ = Mock(
-                return_value=False
-            )
-            mock_get_tracer.return_value = mock_tracer
-
-            # Instrument client
-            instrument_anthropic(mock_client)
+        # Create stub Anthropic client returning it
+        mock_client = make_anthropic_stub(lambda *args, **kwargs: mock_response)
 
-            # Make a call
-            response = mock_client.messages.create(
-                model="claude-3-opus-20240229",
-                messages=[{"role": "user", "content": "Hello"}],
-                max_tokens=100,
-            )
+        # Instrument client
+        instrument_anthropic(mock_client)
 
-            # Verify response
-            assert response is not None
-            assert response.content[0].text == "Hello! I'm Claude."
+        # Make a call
+        response = mock_client.messages.create(
+            model="claude-3-opus-20240229",
+            messages=[{"role": "user", "content": "Hello"}],
+            max_tokens=100,
+        )
 
-            # Verify cost calculation
-            cost = observatory.cost_calculator.calculate_cost(
-                "claude-3-opus-20240229", 10, 8
-            )
-            assert cost is not None
-            assert cost > 0
+        # Verify response
+        assert response is not None
+        assert response.content[0].text == "Hello! I'm Claude."
 
-        finally:
-            observatory.shutdown()
+        # Verify cost calculation
+        cost = observatory.cost_calculator.calculate_cost(
+            "claude-3-opus-20240229", 10, 8
+        )
+        assert cost is not None
+        assert cost > 0
 
 
 class TestContextWindowIntegration:
@@ -220,13 +143,7 @@ class TestContextWindowIntegration:
         optimizer = ContextWindowOptimizer("gpt-4", max_tokens=1000)
         calculator = CostCalculator()
 
-        # Create conversation
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant."},
-        ]
-        for i in range(20):
-            messages.append({"role": "user", "content": f"Question {i}" * 50})
-            messages.append({"role": "assistant", "content": f"Answer {i}" * 50})
+        messages = _CTX_MESSAGES
 
         # Check context window
         check = optimizer.check_context_window(messages)
@@ -251,109 +168,52 @@ class TestContextWindowIntegration:
 class TestMultiProviderIntegration:
     """Test using multiple providers in same application."""
 
-    @patch("llm_observatory.tracing.get_tracer")
-    def test_multiple_providers(self, mock_get_tracer):
+    def test_multiple_providers(self, mock_span, observatory):
         """Test instrumenting multiple providers."""
-        observatory = LLMObservatory(
-            service_name="multi-provider-app",
-            otlp_endpoint=None,
-            auto_shutdown=False,
+        # Create stub clients
+        openai_client = make_openai_stub(noop)
+        anthropic_client = make_anthropic_stub(noop)
+
+        # Instrument both
+        instrument_openai(openai_client)
+        instrument_anthropic(anthropic_client)
+
+        # Both should be instrumented
+        assert hasattr(openai_client, "_llm_observatory_instrumented")
+        assert hasattr(anthropic_client, "_llm_observatory_instrumented")
+
+        # Compare costs
+        costs = observatory.cost_calculator.compare_models(
+            ("gpt-4", "claude-3-opus-20240229", "gpt-3.5-turbo"),
+            prompt_tokens=1000,
+            completion_tokens=500,
         )
 
-        try:
-            # Mock tracer
-            mock_span = Mock()
-            mock_tracer = Mock()
-            mock_tracer.start_as_current_span = MagicMock()
-            mock_tracer.start_as_current_span.return_value.__enter__ = Mock(
-                return_value=mock_span
-            )
-            mock_tracer.start_as_current_span.return_value.__exit__ = Mock(
-                return_value=False
-            )
-            mock_get_tracer.return_value = mock_tracer
-
-            # Create mock OpenAI client
-            openai_client = Mock()
-            openai_client.chat = Mock()
-            openai_client.chat.completions = Mock()
-            openai_client.chat.completions.create = Mock()
-
-            # Create mock Anthropic client
-            anthropic_client = Mock()
-            anthropic_client.messages = Mock()
-            anthropic_client.messages.create = Mock()
-
-            # Instrument both
-            instrument_openai(openai_client)
-            instrument_anthropic(anthropic_client)
-
-            # Both should be instrumented
-            assert hasattr(openai_client, "_llm_observatory_instrumented")
-            assert hasattr(anthropic_client, "_llm_observatory_instrumented")
-
-            # Compare costs
-            costs = observatory.cost_calculator.compare_models(
-                ["gpt-4", "claude-3-opus-20240229", "gpt-3.5-turbo"],
-                prompt_tokens=1000,
-                completion_tokens=500,
-            )
-
-            assert len(costs) == 3
-            assert all(cost is not None for cost in costs.values())
-
-        finally:
-            observatory.shutdown()
+        assert len(costs) == 3
+        assert all(cost is not None for cost in costs.values())
 
 
 class TestErrorHandling:
     """Test error handling in instrumentation."""
 
-    @patch("llm_observatory.tracing.get_tracer")
-    def test_llm_error_captured(self, mock_get_tracer):
+    def test_llm_error_captured(self, mock_span, observatory):
         """Test that LLM errors are captured in spans."""
-        observatory = LLMObservatory(
-            service_name="test-app",
-            otlp_endpoint=None,
-            auto_shutdown=False,
-        )
+        # Create stub client that raises error
+        mock_client = make_openai_stub(_raise_api_error)
 
-        try:
-            # Create mock client that raises error
-            mock_client = Mock()
-            mock_client.chat = Mock()
-            mock_client.chat.completions = Mock()
-            mock_client.chat.completions.create = Mock(
-                side_effect=Exception("API Error")
-            )
+        # Instrument client
+        instrument_openai(mock_client)
 
-            # Mock tracer
-            mock_span = Mock()
-            mock_tracer = Mock()
-            mock_tracer.start_as_current_span = MagicMock()
-            mock_tracer.start_as_current_span.return_value.__enter__ = Mock(
-                return_value=mock_span
-            )
-            mock_tracer.start_as_current_span.return_value.__exit__ = Mock(
-                return_value=False
+        # Make call that will fail
+        with pytest.raises(Exception) as exc_info:
+            mock_client.chat.completions.create(
+                model="gpt-4",
+                messages=[{"role": "user", "content": "Hello"}],
             )
-            mock_get_tracer.return_value = mock_tracer
-
-            # Instrument client
-            instrument_openai(mock_client)
-
-            # Make call that will fail
-            with pytest.raises(Exception, match="API Error"):
-                mock_client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[{"role": "user", "content": "Hello"}],
-                )
-
-            # Verify error was recorded on span
-            assert mock_span.set_attribute.called
+        assert "API Error" in str(exc_info.value)
 
-        finally:
-            observatory.shutdown()
+        # Verify error was recorded on span
+        assert mock_span.set_attribute.called
 
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 """Message and chat endpoints."""
 
-import json
 from typing import List
+
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
@@ -16,7 +17,7 @@ from app.models.schemas import (
     ChatRequest,
     ChatResponse,
 )
-from app.services.llm import llm_service
+from app.services.llm import get_llm_service
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -88,7 +89,7 @@ async def send_message(
                 detail="Use /conversations/{id}/stream endpoint for streaming"
             )
 
-        completion = await llm_service.chat_completion(
+        completion = await get_llm_service().chat_completion(
             messages=llm_messages,
             provider=request.provider,
             model=request.model,
@@ -100,15 +101,15 @@ async def send_message(
         assistant_message = Message(
             conversation_id=conversation_id,
             role=MessageRoleEnum.ASSISTANT,
-            content=completion["content"],
-            provider=completion["provider"],
-            model=completion["model"],
-            prompt_tokens=completion["prompt_tokens"],
-            completion_tokens=completion["completion_tokens"],
-            total_tokens=completion["total_tokens"],
-            cost_usd=completion["cost_usd"],
-            latency_ms=completion["latency_ms"],
-            metadata={"finish_reason": completion.get("finish_reason")},
+            content=completion.content,
+            provider=completion.provider,
+            model=completion.model,
+            prompt_tokens=completion.prompt_tokens,
+            completion_tokens=completion.completion_tokens,
+            total_tokens=completion.total_tokens,
+            cost_usd=completion.cost_usd,
+            latency_ms=completion.latency_ms,
+            metadata={"finish_reason": completion.finish_reason},
         )
         db.add(assistant_message)
 
@@ -118,21 +119,21 @@ async def send_message(
 
         logger.info(
             f"Chat completion for conversation {conversation_id}: "
-            f"model={completion['model']}, "
-            f"tokens={completion['total_tokens']}, "
-            f"cost=${completion['cost_usd']:.6f}, "
-            f"latency={completion['latency_ms']}ms"
+            f"model={completion.model}, "
+            f"tokens={completion.total_tokens}, "
+            f"cost=${completion.cost_usd:.6f}, "
+            f"latency={completion.latency_ms}ms"
         )
 
         return ChatResponse(
             message=MessageResponse.model_validate(assistant_message),
             conversation_id=conversation_id,
             usage={
-                "prompt_tokens": completion["prompt_tokens"],
-                "completion_tokens": completion["completion_tokens"],
-                "total_tokens": completion["total_tokens"],
+                "prompt_tokens": completion.prompt_tokens,
+                "completion_tokens": completion.completion_tokens,
+                "total_tokens": completion.total_tokens,
             },
-            cost_usd=completion["cost_usd"],
+            cost_usd=completion.cost_usd,
         )
 
     except HTTPException:
@@ -287,30 +288,28 @@ async def stream_message(
         async def event_generator():
             """Generate SSE events."""
             try:
-                total_content = ""
                 metadata = {}
 
-                async for chunk in llm_service.stream_completion(
+                async for chunk in get_llm_service().stream_completion(
                     messages=llm_messages,
                     provider=provider,
                     model=model,
                     temperature=temperature,
                     max_tokens=max_tokens,
                 ):
-                    if not chunk.get("done"):
+                    if not chunk.done:
                         # Stream content chunk
-                        yield f"data: {json.dumps({'content': chunk['content'], 'done': False})}\n\n"
-                        total_content += chunk["content"]
+                        yield b"data: " + orjson.dumps({"content": chunk.content, "done": False}) + b"\n\n"
                     else:
                         # Final chunk with metadata
-                        metadata = chunk
+                        metadata = chunk.meta
 
                 # Save assistant message to database
                 async with AsyncSession(db.bind) as session:
                     assistant_message = Message(
                         conversation_id=conversation_id,
                         role=MessageRoleEnum.ASSISTANT,
-                        content=metadata.get("total_content", total_content),
+                        content=metadata.get("total_content", ""),
                         provider=metadata.get("provider"),
                         model=metadata.get("model"),
                         latency_ms=metadata.get("latency_ms"),
@@ -321,13 +320,13 @@ async def stream_message(
                     await session.refresh(assistant_message)
 
                     # Send final event with message ID
-                    yield f"data: {json.dumps({'content': '', 'done': True, 'message_id': assistant_message.id})}\n\n"
+                    yield b"data: " + orjson.dumps({"content": "", "done": True, "message_id": assistant_message.id}) + b"\n\n"
 
                 logger.info(f"Completed streaming for conversation {conversation_id}")
 
             except Exception as e:
                 logger.error(f"Streaming error: {e}", exc_info=True)
-                yield f"data: {json.dumps({'error': str(e), 'done': True})}\n\n"
+                yield b"data: " + orjson.dumps({"error": str(e), "done": True}) + b"\n\n"
 
         return StreamingResponse(
             event_generator(),
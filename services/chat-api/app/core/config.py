@@ -55,6 +55,18 @@ class Settings(BaseSettings):
     AZURE_OPENAI_ENDPOINT: Optional[str] = None
     AZURE_OPENAI_API_VERSION: str = "2024-02-01"
 
+    # Shared HTTP transport for LLM provider clients
+    HTTP_MAX_CONN: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP2_ENABLED: bool = True
+
+    # Outbound LLM request limits, per provider (0 disables the RPM limit)
+    OPENAI_MAX_CONCURRENCY: int = 50
+    ANTHROPIC_MAX_CONCURRENCY: int = 50
+    AZURE_MAX_CONCURRENCY: int = 50
+    LLM_REQUESTS_PER_MINUTE: int = 0
+
     # LLM Configuration
     DEFAULT_PROVIDER: str = "openai"
     MAX_TOKENS: int = 4096
@@ -62,6 +74,12 @@ class Settings(BaseSettings):
     CONTEXT_WINDOW_LIMIT: int = 8000
     ENABLE_STREAMING: bool = True
 
+    # Batch completions
+    LLM_BATCH_MAX_CONCURRENCY: int = 8
+    LLM_BATCH_REQUESTS_PER_MINUTE: int = 0
+    LLM_BATCH_POLL_INTERVAL: float = 5.0
+    LLM_BATCH_MAX_POLL_INTERVAL: float = 300.0
+
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = 100
@@ -11,6 +11,7 @@ from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
 from app.database.session import init_db, close_db
+from app.services.llm import close_llm_service
 from app.api.v1 import conversations, messages
 
 # Setup logging
@@ -41,6 +42,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     logger.info("Shutting down application")
     await close_db()
     logger.info("Database connections closed")
+    await close_llm_service()
+    logger.info("LLM HTTP connections closed")
 
 
 # Create FastAPI application
@@ -1,5 +1,6 @@
 """Cost tracking service for LLM API calls."""
 
+import functools
 from typing import Dict, Optional
 from app.core.logging import get_logger
 
@@ -31,19 +32,28 @@ class CostTracker:
         "azure-gpt-35-turbo": {"input": 0.0015, "output": 0.002},
     }
 
+    # Prompt-cache rates relative to the input rate, used when a model's
+    # pricing has no explicit "cached_input"/"cache_write" entry
+    CACHED_INPUT_MULTIPLIER: float = 0.1
+    CACHE_WRITE_MULTIPLIER: float = 1.25
+
     @classmethod
     def calculate_cost(
         cls,
         model: str,
         input_tokens: int,
         output_tokens: int,
+        cached_input_tokens: int = 0,
+        cache_write_tokens: int = 0,
     ) -> float:
         """Calculate cost for a model based on token usage.
 
         Args:
             model: Model name
-            input_tokens: Number of input tokens
+            input_tokens: Number of uncached input tokens
             output_tokens: Number of output tokens
+            cached_input_tokens: Number of input tokens read from the prompt cache
+            cache_write_tokens: Number of input tokens written to the prompt cache
 
         Returns:
             Total cost in USD
@@ -54,27 +64,45 @@ class CostTracker:
         # Get pricing
         pricing = cls.PRICING.get(model_key)
         if not pricing:
-            logger.warning(f"Unknown model for pricing: {model}")
+            logger.warning("Unknown model for pricing: %s", model)
             return 0.0
 
         # Calculate cost
-        input_cost = (input_tokens / 1000) * pricing["input"]
+        input_rate = pricing["input"]
+        input_cost = (input_tokens / 1000) * input_rate
         output_cost = (output_tokens / 1000) * pricing["output"]
-        total_cost = input_cost + output_cost
+        cache_cost = 0.0
+        if cached_input_tokens:
+            cached_rate = pricing.get("cached_input", input_rate * cls.CACHED_INPUT_MULTIPLIER)
+            cache_cost += (cached_input_tokens / 1000) * cached_rate
+        if cache_write_tokens:
+            write_rate = pricing.get("cache_write", input_rate * cls.CACHE_WRITE_MULTIPLIER)
+            cache_cost += (cache_write_tokens / 1000) * write_rate
+        total_cost = input_cost + output_cost + cache_cost
 
         logger.debug(
-            f"Cost calculated for {model}: "
-            f"input={input_tokens}tok/${input_cost:.6f}, "
-            f"output={output_tokens}tok/${output_cost:.6f}, "
-            f"total=${total_cost:.6f}"
+            "Cost calculated for %s: "
+            "input=%stok/$%.6f, "
+            "cache=%s+%stok/$%.6f, "
+            "output=%stok/$%.6f, "
+            "total=$%.6f",
+            model,
+            input_tokens, input_cost,
+            cached_input_tokens, cache_write_tokens, cache_cost,
+            output_tokens, output_cost,
+            total_cost,
         )
 
         return round(total_cost, 8)
 
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def _normalize_model_name(cls, model: str) -> str:
         """Normalize model name for pricing lookup.
 
+        Cached because it runs on every completion and only sees a handful
+        of distinct model names.
+
         Args:
             model: Original model name
 
@@ -1,23 +1,108 @@
 """LLM service for handling chat completions."""
 
+import asyncio
 import time
-from typing import Optional, List, Dict, Any, AsyncIterator
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, AsyncIterator, NamedTuple, Tuple
+
+import httpx
 from openai import AsyncOpenAI, AsyncAzureOpenAI, OpenAIError
 from anthropic import AsyncAnthropic, AnthropicError
 
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.services.cost_tracker import CostTracker
+from app.services.rate_limit import TokenBucket
 from app.database.models import ProviderEnum, MessageRoleEnum
 
 logger = get_logger(__name__)
 
+_OPENAI = ProviderEnum.OPENAI.value
+_ANTHROPIC = ProviderEnum.ANTHROPIC.value
+_AZURE = ProviderEnum.AZURE_OPENAI.value
+
+
+class StreamChunk(NamedTuple):
+    """A streamed completion chunk; only the final chunk carries metadata."""
+
+    content: str
+    done: bool
+    meta: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class ChatResult:
+    """Result of a non-streaming chat completion."""
+
+    content: str
+    provider: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost_usd: float
+    latency_ms: int
+    finish_reason: Optional[str]
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+def split_system_message(
+    messages: List[Dict[str, str]],
+) -> Tuple[Optional[str], List[Dict[str, str]]]:
+    """Split messages into the Anthropic system prompt and chat turns in one pass.
+
+    The first system message becomes the system prompt; any later ones are
+    dropped, matching the previous behaviour. When there is no system message
+    and every message is already a plain role/content dict, the input list is
+    returned as-is instead of being copied.
+    """
+    system_message = None
+    # Stays None while the input can be passed through unchanged
+    anthropic_messages = None
+    for i, m in enumerate(messages):
+        role = m["role"]
+        if role == "system":
+            if system_message is None:
+                system_message = m["content"]
+            if anthropic_messages is None:
+                anthropic_messages = messages[:i]
+        elif len(m) == 2:
+            if anthropic_messages is not None:
+                anthropic_messages.append(m)
+        else:
+            if anthropic_messages is None:
+                anthropic_messages = messages[:i]
+            anthropic_messages.append({"role": role, "content": m["content"]})
+
+    if anthropic_messages is None:
+        anthropic_messages = messages
+    return system_message, anthropic_messages
+
+
+def _openai_cached_tokens(usage: Any) -> int:
+    """Return prompt-cache hits from OpenAI usage, or 0 when not reported."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None) or 0
+
 
 class LLMService:
     """Service for LLM chat completions with multi-provider support."""
 
     def __init__(self):
         """Initialize LLM clients."""
+        # One connection pool shared by every provider client so keep-alive
+        # connections and TLS sessions are reused across SDKs
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONN,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=settings.OPENAI_TIMEOUT,
+            http2=settings.HTTP2_ENABLED,
+        )
+
         # OpenAI client
         self.openai_client = None
         if settings.OPENAI_API_KEY:
@@ -26,6 +111,7 @@ class LLMService:
                 organization=settings.OPENAI_ORG_ID,
                 max_retries=settings.OPENAI_MAX_RETRIES,
                 timeout=settings.OPENAI_TIMEOUT,
+                http_client=self._http_client,
             )
 
         # Azure OpenAI client
@@ -37,6 +123,7 @@ class LLMService:
                 api_version=settings.AZURE_OPENAI_API_VERSION,
                 max_retries=settings.OPENAI_MAX_RETRIES,
                 timeout=settings.OPENAI_TIMEOUT,
+                http_client=self._http_client,
             )
 
         # Anthropic client
@@ -44,10 +131,41 @@ class LLMService:
         if settings.ANTHROPIC_API_KEY:
             self.anthropic_client = AsyncAnthropic(
                 api_key=settings.ANTHROPIC_API_KEY,
+                http_client=self._http_client,
             )
 
         self.cost_tracker = CostTracker()
 
+        # Per-provider caps so a burst queues here instead of exhausting
+        # the shared connection pool
+        self._semaphores = {
+            _OPENAI: asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY),
+            _ANTHROPIC: asyncio.Semaphore(settings.ANTHROPIC_MAX_CONCURRENCY),
+            _AZURE: asyncio.Semaphore(settings.AZURE_MAX_CONCURRENCY),
+        }
+        self._rate_limiters = {}
+        if settings.LLM_REQUESTS_PER_MINUTE:
+            self._rate_limiters = {
+                provider: TokenBucket(settings.LLM_REQUESTS_PER_MINUTE)
+                for provider in self._semaphores
+            }
+
+        # Provider routing tables, keyed by ProviderEnum value
+        self._completion_dispatch = {
+            _OPENAI: self._openai_completion,
+            _ANTHROPIC: self._anthropic_completion,
+            _AZURE: self._azure_openai_completion,
+        }
+        self._stream_dispatch = {
+            _OPENAI: self._openai_stream,
+            _ANTHROPIC: self._anthropic_stream,
+            _AZURE: self._azure_openai_stream,
+        }
+
+    async def close(self) -> None:
+        """Close the shared HTTP connection pool."""
+        await self._http_client.aclose()
+
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -56,7 +174,7 @@ class LLMService:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         **kwargs
-    ) -> Dict[str, Any]:
+    ) -> ChatResult:
         """Generate a chat completion.
 
         Args:
@@ -68,28 +186,23 @@ class LLMService:
             **kwargs: Additional provider-specific parameters
 
         Returns:
-            Dict with response, usage, and metadata
+            ChatResult with response, usage, and metadata
         """
         provider = provider or settings.DEFAULT_PROVIDER
         temperature = temperature or settings.TEMPERATURE
         max_tokens = max_tokens or settings.MAX_TOKENS
 
         # Route to appropriate provider
-        if provider == ProviderEnum.OPENAI.value:
-            return await self._openai_completion(
-                messages, model, temperature, max_tokens, **kwargs
-            )
-        elif provider == ProviderEnum.ANTHROPIC.value:
-            return await self._anthropic_completion(
-                messages, model, temperature, max_tokens, **kwargs
-            )
-        elif provider == ProviderEnum.AZURE_OPENAI.value:
-            return await self._azure_openai_completion(
-                messages, model, temperature, max_tokens, **kwargs
-            )
-        else:
+        completion_fn = self._completion_dispatch.get(provider)
+        if completion_fn is None:
             raise ValueError(f"Unsupported provider: {provider}")
 
+        async with self._semaphores[provider]:
+            rate_limiter = self._rate_limiters.get(provider)
+            if rate_limiter:
+                await rate_limiter.acquire()
+            return await completion_fn(messages, model, temperature, max_tokens, **kwargs)
+
     async def stream_completion(
         self,
         messages: List[Dict[str, str]],
@@ -98,7 +211,7 @@ class LLMService:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         **kwargs
-    ) -> AsyncIterator[Dict[str, Any]]:
+    ) -> AsyncIterator[StreamChunk]:
         """Stream a chat completion.
 
         Args:
@@ -110,31 +223,25 @@ class LLMService:
             **kwargs: Additional parameters
 
         Yields:
-            Dicts with chunk data
+            StreamChunk per content delta, then a final chunk with metadata
         """
         provider = provider or settings.DEFAULT_PROVIDER
         temperature = temperature or settings.TEMPERATURE
         max_tokens = max_tokens or settings.MAX_TOKENS
 
         # Route to appropriate provider
-        if provider == ProviderEnum.OPENAI.value:
-            async for chunk in self._openai_stream(
-                messages, model, temperature, max_tokens, **kwargs
-            ):
-                yield chunk
-        elif provider == ProviderEnum.ANTHROPIC.value:
-            async for chunk in self._anthropic_stream(
-                messages, model, temperature, max_tokens, **kwargs
-            ):
-                yield chunk
-        elif provider == ProviderEnum.AZURE_OPENAI.value:
-            async for chunk in self._azure_openai_stream(
-                messages, model, temperature, max_tokens, **kwargs
-            ):
-                yield chunk
-        else:
+        stream_fn = self._stream_dispatch.get(provider)
+        if stream_fn is None:
             raise ValueError(f"Unsupported provider: {provider}")
 
+        # The slot is held for the whole stream since it keeps a connection open
+        async with self._semaphores[provider]:
+            rate_limiter = self._rate_limiters.get(provider)
+            if rate_limiter:
+                await rate_limiter.acquire()
+            async for chunk in stream_fn(messages, model, temperature, max_tokens, **kwargs):
+                yield chunk
+
     async def _openai_completion(
         self,
         messages: List[Dict[str, str]],
@@ -142,13 +249,13 @@ class LLMService:
         temperature: float,
         max_tokens: int,
         **kwargs
-    ) -> Dict[str, Any]:
+    ) -> ChatResult:
         """OpenAI chat completion."""
         if not self.openai_client:
             raise ValueError("OpenAI client not configured")
 
         model = model or settings.OPENAI_DEFAULT_MODEL
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
             response = await self.openai_client.chat.completions.create(
@@ -159,54 +266,82 @@ class LLMService:
                 **kwargs
             )
 
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
             # Extract response data
-            content = response.choices[0].message.content
+            choice = response.choices[0]
             usage = response.usage
+            prompt_tokens = usage.prompt_tokens
+            completion_tokens = usage.completion_tokens
+            cached_tokens = _openai_cached_tokens(usage)
 
             # Calculate cost
             cost_usd = self.cost_tracker.calculate_cost(
                 model,
-                usage.prompt_tokens,
-                usage.completion_tokens,
+                prompt_tokens - cached_tokens,
+                completion_tokens,
+                cached_input_tokens=cached_tokens,
             )
 
-            return {
-                "content": content,
-                "provider": ProviderEnum.OPENAI.value,
-                "model": model,
-                "prompt_tokens": usage.prompt_tokens,
-                "completion_tokens": usage.completion_tokens,
-                "total_tokens": usage.total_tokens,
-                "cost_usd": cost_usd,
-                "latency_ms": latency_ms,
-                "finish_reason": response.choices[0].finish_reason,
-            }
+            return ChatResult(
+                content=choice.message.content,
+                provider=_OPENAI,
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=usage.total_tokens,
+                cached_tokens=cached_tokens,
+                cost_usd=cost_usd,
+                latency_ms=latency_ms,
+                finish_reason=choice.finish_reason,
+            )
 
         except OpenAIError as e:
-            logger.error(f"OpenAI API error: {e}")
+            logger.error("OpenAI API error: %s", e)
             raise
 
-    async def _openai_stream(
+    def _openai_stream(
         self,
         messages: List[Dict[str, str]],
         model: Optional[str],
         temperature: float,
         max_tokens: int,
         **kwargs
-    ) -> AsyncIterator[Dict[str, Any]]:
+    ) -> AsyncIterator[StreamChunk]:
         """OpenAI streaming completion."""
         if not self.openai_client:
             raise ValueError("OpenAI client not configured")
 
+        return self._stream_openai_compatible(
+            self.openai_client,
+            _OPENAI,
+            "OpenAI",
+            messages, model, temperature, max_tokens,
+            **kwargs
+        )
+
+    async def _stream_openai_compatible(
+        self,
+        client: AsyncOpenAI,
+        provider_value: str,
+        provider_label: str,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """Streaming completion shared by OpenAI and Azure OpenAI clients."""
         model = model or settings.OPENAI_DEFAULT_MODEL
-        start_time = time.time()
-        first_token_time = None
-        total_content = ""
+        # Bound to locals: these are looked up on every streamed token
+        now_ns = time.perf_counter_ns
+        start_ns = now_ns()
+        first_token_ns = None
+        total_parts: List[str] = []
+        append_part = total_parts.append
 
         try:
-            stream = await self.openai_client.chat.completions.create(
+            stream = await client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
@@ -216,34 +351,34 @@ class LLMService:
             )
 
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    if first_token_time is None:
-                        first_token_time = time.time()
+                # Azure sends prompt filter results and usage in chunks without choices
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if not content:
+                    continue
+
+                if first_token_ns is None:
+                    first_token_ns = now_ns()
 
-                    content = chunk.choices[0].delta.content
-                    total_content += content
+                append_part(content)
 
-                    yield {
-                        "content": content,
-                        "done": False,
-                    }
+                yield StreamChunk(content, False)
 
             # Final chunk with metadata
-            latency_ms = int((time.time() - start_time) * 1000)
-            ttft_ms = int((first_token_time - start_time) * 1000) if first_token_time else None
+            latency_ms = (now_ns() - start_ns) // 1_000_000
+            ttft_ms = (first_token_ns - start_ns) // 1_000_000 if first_token_ns is not None else None
 
-            yield {
-                "content": "",
-                "done": True,
-                "provider": ProviderEnum.OPENAI.value,
+            yield StreamChunk("", True, {
+                "provider": provider_value,
                 "model": model,
                 "latency_ms": latency_ms,
                 "time_to_first_token_ms": ttft_ms,
-                "total_content": total_content,
-            }
+                "total_content": "".join(total_parts),
+            })
 
         except OpenAIError as e:
-            logger.error(f"OpenAI streaming error: {e}")
+            logger.error("%s streaming error: %s", provider_label, e)
             raise
 
     async def _anthropic_completion(
@@ -253,25 +388,17 @@ class LLMService:
         temperature: float,
         max_tokens: int,
         **kwargs
-    ) -> Dict[str, Any]:
+    ) -> ChatResult:
         """Anthropic chat completion."""
         if not self.anthropic_client:
             raise ValueError("Anthropic client not configured")
 
         model = model or settings.ANTHROPIC_DEFAULT_MODEL
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
             # Convert messages to Anthropic format
-            system_message = next(
-                (m["content"] for m in messages if m["role"] == "system"),
-                None
-            )
-            anthropic_messages = [
-                {"role": m["role"], "content": m["content"]}
-                for m in messages
-                if m["role"] != "system"
-            ]
+            system_message, anthropic_messages = split_system_message(messages)
 
             response = await self.anthropic_client.messages.create(
                 model=model,
@@ -282,33 +409,43 @@ class LLMService:
                 **kwargs
             )
 
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
             # Extract response data
             content = response.content[0].text
             usage = response.usage
+            input_tokens = usage.input_tokens
+            output_tokens = usage.output_tokens
+            # input_tokens excludes prompt-cache reads and writes
+            cached_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+            cache_write_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+            prompt_tokens = input_tokens + cached_tokens + cache_write_tokens
 
             # Calculate cost
             cost_usd = self.cost_tracker.calculate_cost(
                 model,
-                usage.input_tokens,
-                usage.output_tokens,
+                input_tokens,
+                output_tokens,
+                cached_input_tokens=cached_tokens,
+                cache_write_tokens=cache_write_tokens,
             )
 
-            return {
-                "content": content,
-                "provider": ProviderEnum.ANTHROPIC.value,
-                "model": model,
-                "prompt_tokens": usage.input_tokens,
-                "completion_tokens": usage.output_tokens,
-                "total_tokens": usage.input_tokens + usage.output_tokens,
-                "cost_usd": cost_usd,
-                "latency_ms": latency_ms,
-                "finish_reason": response.stop_reason,
-            }
+            return ChatResult(
+                content=content,
+                provider=_ANTHROPIC,
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=output_tokens,
+                total_tokens=prompt_tokens + output_tokens,
+                cached_tokens=cached_tokens,
+                cache_write_tokens=cache_write_tokens,
+                cost_usd=cost_usd,
+                latency_ms=latency_ms,
+                finish_reason=response.stop_reason,
+            )
 
         except AnthropicError as e:
-            logger.error(f"Anthropic API error: {e}")
+            logger.error("Anthropic API error: %s", e)
             raise
 
     async def _anthropic_stream(
@@ -318,27 +455,22 @@ class LLMService:
         temperature: float,
         max_tokens: int,
         **kwargs
-    ) -> AsyncIterator[Dict[str, Any]]:
+    ) -> AsyncIterator[StreamChunk]:
         """Anthropic streaming completion."""
         if not self.anthropic_client:
             raise ValueError("Anthropic client not configured")
 
         model = model or settings.ANTHROPIC_DEFAULT_MODEL
-        start_time = time.time()
-        first_token_time = None
-        total_content = ""
+        # Bound to locals: these are looked up on every streamed token
+        now_ns = time.perf_counter_ns
+        start_ns = now_ns()
+        first_token_ns = None
+        total_parts: List[str] = []
+        append_part = total_parts.append
 
         try:
             # Convert messages
-            system_message = next(
-                (m["content"] for m in messages if m["role"] == "system"),
-                None
-            )
-            anthropic_messages = [
-                {"role": m["role"], "content": m["content"]}
-                for m in messages
-                if m["role"] != "system"
-            ]
+            system_message, anthropic_messages = split_system_message(messages)
 
             async with self.anthropic_client.messages.stream(
                 model=model,
@@ -349,32 +481,27 @@ class LLMService:
                 **kwargs
             ) as stream:
                 async for text in stream.text_stream:
-                    if first_token_time is None:
-                        first_token_time = time.time()
+                    if first_token_ns is None:
+                        first_token_ns = now_ns()
 
-                    total_content += text
+                    append_part(text)
 
-                    yield {
-                        "content": text,
-                        "done": False,
-                    }
+                    yield StreamChunk(text, False)
 
             # Final chunk
-            latency_ms = int((time.time() - start_time) * 1000)
-            ttft_ms = int((first_token_time - start_time) * 1000) if first_token_time else None
+            latency_ms = (now_ns() - start_ns) // 1_000_000
+            ttft_ms = (first_token_ns - start_ns) // 1_000_000 if first_token_ns is not None else None
 
-            yield {
-                "content": "",
-                "done": True,
-                "provider": ProviderEnum.ANTHROPIC.value,
+            yield StreamChunk("", True, {
+                "provider": _ANTHROPIC,
                 "model": model,
                 "latency_ms": latency_ms,
                 "time_to_first_token_ms": ttft_ms,
-                "total_content": total_content,
-            }
+                "total_content": "".join(total_parts),
+            })
 
         except AnthropicError as e:
-            logger.error(f"Anthropic streaming error: {e}")
+            logger.error("Anthropic streaming error: %s", e)
             raise
 
     async def _azure_openai_completion(
@@ -384,14 +511,14 @@ class LLMService:
         temperature: float,
         max_tokens: int,
         **kwargs
-    ) -> Dict[str, Any]:
+    ) -> ChatResult:
         """Azure OpenAI chat completion."""
         if not self.azure_client:
             raise ValueError("Azure OpenAI client not configured")
 
         # Use same implementation as OpenAI with azure client
         model = model or settings.OPENAI_DEFAULT_MODEL
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
             response = await self.azure_client.chat.completions.create(
@@ -402,47 +529,73 @@ class LLMService:
                 **kwargs
             )
 
-            latency_ms = int((time.time() - start_time) * 1000)
-            content = response.choices[0].message.content
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            choice = response.choices[0]
             usage = response.usage
+            prompt_tokens = usage.prompt_tokens
+            completion_tokens = usage.completion_tokens
+            cached_tokens = _openai_cached_tokens(usage)
 
             cost_usd = self.cost_tracker.calculate_cost(
                 f"azure-{model}",
-                usage.prompt_tokens,
-                usage.completion_tokens,
+                prompt_tokens - cached_tokens,
+                completion_tokens,
+                cached_input_tokens=cached_tokens,
             )
 
-            return {
-                "content": content,
-                "provider": ProviderEnum.AZURE_OPENAI.value,
-                "model": model,
-                "prompt_tokens": usage.prompt_tokens,
-                "completion_tokens": usage.completion_tokens,
-                "total_tokens": usage.total_tokens,
-                "cost_usd": cost_usd,
-                "latency_ms": latency_ms,
-                "finish_reason": response.choices[0].finish_reason,
-            }
+            return ChatResult(
+                content=choice.message.content,
+                provider=_AZURE,
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=usage.total_tokens,
+                cached_tokens=cached_tokens,
+                cost_usd=cost_usd,
+                latency_ms=latency_ms,
+                finish_reason=choice.finish_reason,
+            )
 
         except OpenAIError as e:
-            logger.error(f"Azure OpenAI API error: {e}")
+            logger.error("Azure OpenAI API error: %s", e)
             raise
 
-    async def _azure_openai_stream(
+    def _azure_openai_stream(
         self,
         messages: List[Dict[str, str]],
         model: Optional[str],
         temperature: float,
         max_tokens: int,
         **kwargs
-    ) -> AsyncIterator[Dict[str, Any]]:
+    ) -> AsyncIterator[StreamChunk]:
         """Azure OpenAI streaming completion."""
-        # Same as OpenAI streaming but with azure client
-        async for chunk in self._openai_stream(messages, model, temperature, max_tokens, **kwargs):
-            if chunk.get("done"):
-                chunk["provider"] = ProviderEnum.AZURE_OPENAI.value
-            yield chunk
+        if not self.azure_client:
+            raise ValueError("Azure OpenAI client not configured")
+
+        return self._stream_openai_compatible(
+            self.azure_client,
+            _AZURE,
+            "Azure OpenAI",
+            messages, model, temperature, max_tokens,
+            **kwargs
+        )
+
+
+# Global LLM service instance, created on first use
+_llm_service: Optional[LLMService] = None
+
+
+def get_llm_service() -> LLMService:
+    """Get the global LLM service, creating its clients on first call."""
+    global _llm_service
+    if _llm_service is None:
+        _llm_service = LLMService()
+    return _llm_service
 
 
-# Global LLM service instance
-llm_service = LLMService()
+async def close_llm_service() -> None:
+    """Close the global LLM service if it was created."""
+    global _llm_service
+    if _llm_service is not None:
+        await _llm_service.close()
+        _llm_service = None
@@ -0,0 +1,325 @@
+"""Batch chat completions for offline and bulk-scoring workloads."""
+
+import asyncio
+import json
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.cost_tracker import CostTracker
+from app.services.llm import LLMService, split_system_message
+from app.services.rate_limit import TokenBucket
+
+logger = get_logger(__name__)
+
+# Provider batch endpoints bill at half the synchronous rate
+BATCH_DISCOUNT = 0.5
+
+OPENAI_BATCH_TERMINAL = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+class LLMBatchProcessor:
+    """Run many chat completions through provider batch APIs or bounded concurrency.
+
+    Each request is a dict of ``LLMService.chat_completion`` keyword arguments.
+    Results come back in request order as dicts with the ``ChatResult``
+    fields; a request that fails yields a dict with an ``error``
+    key instead of raising, so one bad item does not discard the whole batch.
+
+    Provider batch jobs trade latency (up to 24h) for half-price tokens and
+    much higher throughput, so they suit offline workloads only.
+    """
+
+    def __init__(
+        self,
+        service: LLMService,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_poll_interval: Optional[float] = None,
+    ):
+        """Initialize the processor.
+
+        Args:
+            service: LLM service providing configured clients
+            max_concurrency: Concurrent requests for the non-batch path
+            requests_per_minute: Request start rate for the non-batch path (0 disables)
+            poll_interval: Initial delay between batch status checks in seconds
+            max_poll_interval: Upper bound for the backed-off poll delay
+        """
+        self.service = service
+        self.max_concurrency = max_concurrency or settings.LLM_BATCH_MAX_CONCURRENCY
+        self.poll_interval = poll_interval or settings.LLM_BATCH_POLL_INTERVAL
+        self.max_poll_interval = max_poll_interval or settings.LLM_BATCH_MAX_POLL_INTERVAL
+
+        if requests_per_minute is None:
+            requests_per_minute = settings.LLM_BATCH_REQUESTS_PER_MINUTE
+        self.rate_limiter = TokenBucket(requests_per_minute) if requests_per_minute else None
+
+    async def batch_chat_completion(
+        self,
+        requests: List[Dict[str, Any]],
+        use_batch_api: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Run chat completion requests.
+
+        Args:
+            requests: chat_completion keyword arguments, one dict per request
+            use_batch_api: Submit OpenAI/Anthropic requests as provider batch jobs
+
+        Returns:
+            Result dicts in request order
+        """
+        if not use_batch_api:
+            return await self._run_concurrent(requests)
+
+        batch_runners = {
+            "openai": (self.service.openai_client, self._openai_batch),
+            "anthropic": (self.service.anthropic_client, self._anthropic_batch),
+        }
+
+        # Group by provider; anything without a batch endpoint runs concurrently
+        groups: Dict[str, List[int]] = {}
+        for i, request in enumerate(requests):
+            provider = request.get("provider") or settings.DEFAULT_PROVIDER
+            client, _ = batch_runners.get(provider, (None, None))
+            groups.setdefault(provider if client else "", []).append(i)
+
+        async def run_group(provider: str, indices: List[int]) -> List[Dict[str, Any]]:
+            group = [requests[i] for i in indices]
+            if not provider:
+                return await self._run_concurrent(group)
+            client, runner = batch_runners[provider]
+            try:
+                return await runner(client, group)
+            except Exception as e:
+                logger.error("%s batch failed: %s", provider, e)
+                return [self._error_result(r, provider, e) for r in group]
+
+        group_results = await asyncio.gather(
+            *(run_group(provider, indices) for provider, indices in groups.items())
+        )
+
+        results: List[Dict[str, Any]] = [{}] * len(requests)
+        for indices, group_result in zip(groups.values(), group_results):
+            for i, result in zip(indices, group_result):
+                results[i] = result
+        return results
+
+    async def _run_concurrent(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run requests through chat_completion with bounded concurrency."""
+        sem = asyncio.Semaphore(self.max_concurrency)
+
+        async def one(request: Dict[str, Any]) -> Dict[str, Any]:
+            async with sem:
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire()
+                try:
+                    return asdict(await self.service.chat_completion(**request))
+                except Exception as e:
+                    logger.error("Batch request failed: %s", e)
+                    return self._error_result(request, request.get("provider"), e)
+
+        return list(await asyncio.gather(*(one(r) for r in requests)))
+
+    async def _openai_batch(self, client: Any, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run requests as one OpenAI Batch API job."""
+        models = []
+        lines = []
+        for i, request in enumerate(requests):
+            body = self._request_params(request, settings.OPENAI_DEFAULT_MODEL)
+            models.append(body["model"])
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            }))
+
+        batch_file = await client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch",
+        )
+        created = await client.post(
+            "/batches",
+            body={
+                "input_file_id": batch_file.id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+            cast_to=httpx.Response,
+        )
+        batch_id = created.json()["id"]
+        logger.info("Submitted OpenAI batch %s with %s requests", batch_id, len(requests))
+
+        async def fetch() -> Dict[str, Any]:
+            response = await client.get(f"/batches/{batch_id}", cast_to=httpx.Response)
+            return response.json()
+
+        batch = await self._poll(fetch, lambda b: b["status"] in OPENAI_BATCH_TERMINAL)
+        if batch["status"] != "completed":
+            raise RuntimeError(f"OpenAI batch {batch_id} ended with status {batch['status']}")
+
+        lines_by_id: Dict[str, Dict[str, Any]] = {}
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if file_id:
+                content = await client.files.content(file_id)
+                for line in content.text.splitlines():
+                    if line:
+                        item = json.loads(line)
+                        lines_by_id[item["custom_id"]] = item
+
+        results = []
+        for i, model in enumerate(models):
+            item = lines_by_id.get(str(i))
+            response = (item or {}).get("response") or {}
+            if response.get("status_code") != 200:
+                error = (item or {}).get("error") or response.get("body") or "missing from batch output"
+                results.append(self._error_result(requests[i], "openai", error, model))
+                continue
+
+            body = response["body"]
+            choice = body["choices"][0]
+            usage = body["usage"]
+            prompt_tokens = usage["prompt_tokens"]
+            completion_tokens = usage["completion_tokens"]
+            cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+            cost_usd = CostTracker.calculate_cost(
+                model,
+                prompt_tokens - cached_tokens,
+                completion_tokens,
+                cached_input_tokens=cached_tokens,
+            ) * BATCH_DISCOUNT
+
+            results.append({
+                "content": choice["message"]["content"],
+                "provider": "openai",
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": usage["total_tokens"],
+                "cached_tokens": cached_tokens,
+                "cache_write_tokens": 0,
+                "cost_usd": round(cost_usd, 8),
+                "latency_ms": None,
+                "finish_reason": choice["finish_reason"],
+                "batch_id": batch_id,
+            })
+        return results
+
+    async def _anthropic_batch(self, client: Any, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run requests as one Anthropic Message Batches job."""
+        models = []
+        batch_requests = []
+        for i, request in enumerate(requests):
+            params = self._request_params(request, settings.ANTHROPIC_DEFAULT_MODEL)
+            system_message, anthropic_messages = split_system_message(params["messages"])
+            params["messages"] = anthropic_messages
+            if system_message is not None:
+                params["system"] = system_message
+
+            models.append(params["model"])
+            batch_requests.append({"custom_id": str(i), "params": params})
+
+        created = await client.post(
+            "/v1/messages/batches",
+            body={"requests": batch_requests},
+            cast_to=httpx.Response,
+        )
+        batch_id = created.json()["id"]
+        logger.info("Submitted Anthropic batch %s with %s requests", batch_id, len(requests))
+
+        async def fetch() -> Dict[str, Any]:
+            response = await client.get(f"/v1/messages/batches/{batch_id}", cast_to=httpx.Response)
+            return response.json()
+
+        batch = await self._poll(fetch, lambda b: b["processing_status"] == "ended")
+        output = await client.get(batch["results_url"], cast_to=httpx.Response)
+
+        lines_by_id: Dict[str, Dict[str, Any]] = {}
+        for line in output.text.splitlines():
+            if line:
+                item = json.loads(line)
+                lines_by_id[item["custom_id"]] = item["result"]
+
+        results = []
+        for i, model in enumerate(models):
+            result = lines_by_id.get(str(i)) or {}
+            if result.get("type") != "succeeded":
+                error = result.get("error") or result.get("type") or "missing from batch output"
+                results.append(self._error_result(requests[i], "anthropic", error, model))
+                continue
+
+            message = result["message"]
+            usage = message["usage"]
+            input_tokens = usage["input_tokens"]
+            output_tokens = usage["output_tokens"]
+            cached_tokens = usage.get("cache_read_input_tokens") or 0
+            cache_write_tokens = usage.get("cache_creation_input_tokens") or 0
+            prompt_tokens = input_tokens + cached_tokens + cache_write_tokens
+            cost_usd = CostTracker.calculate_cost(
+                model,
+                input_tokens,
+                output_tokens,
+                cached_input_tokens=cached_tokens,
+                cache_write_tokens=cache_write_tokens,
+            ) * BATCH_DISCOUNT
+
+            results.append({
+                "content": message["content"][0]["text"],
+                "provider": "anthropic",
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+                "cached_tokens": cached_tokens,
+                "cache_write_tokens": cache_write_tokens,
+                "cost_usd": round(cost_usd, 8),
+                "latency_ms": None,
+                "finish_reason": message["stop_reason"],
+                "batch_id": batch_id,
+            })
+        return results
+
+    async def _poll(
+        self,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        is_done: Callable[[Dict[str, Any]], bool],
+    ) -> Dict[str, Any]:
+        """Fetch batch status with exponential backoff until it is done."""
+        delay = self.poll_interval
+        while True:
+            batch = await fetch()
+            if is_done(batch):
+                return batch
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+
+    @staticmethod
+    def _request_params(request: Dict[str, Any], default_model: str) -> Dict[str, Any]:
+        """Build provider request parameters with the same defaults as chat_completion."""
+        params = {
+            k: v for k, v in request.items()
+            if k not in ("provider", "model", "temperature", "max_tokens")
+        }
+        params["model"] = request.get("model") or default_model
+        params["temperature"] = request.get("temperature") or settings.TEMPERATURE
+        params["max_tokens"] = request.get("max_tokens") or settings.MAX_TOKENS
+        return params
+
+    @staticmethod
+    def _error_result(
+        request: Dict[str, Any],
+        provider: Optional[str],
+        error: Any,
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the result entry for a request that did not complete."""
+        return {
+            "provider": provider or settings.DEFAULT_PROVIDER,
+            "model": model or request.get("model"),
+            "error": str(error),
+        }
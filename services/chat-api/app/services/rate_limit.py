@@ -0,0 +1,35 @@
+"""Request rate limiting for outbound LLM calls."""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket limiting how many requests start per minute."""
+
+    def __init__(self, requests_per_minute: int):
+        """Initialize a full bucket.
+
+        Args:
+            requests_per_minute: Sustained request rate and burst size
+        """
+        self.capacity = float(requests_per_minute)
+        self.tokens = self.capacity
+        self.refill_per_second = requests_per_minute / 60.0
+        self.updated_at = time.perf_counter()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.perf_counter()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated_at) * self.refill_per_second,
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.refill_per_second)
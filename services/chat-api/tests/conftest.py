@@ -3,9 +3,8 @@
 import asyncio
 from typing import AsyncGenerator, Generator
 import pytest
-from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from app.main import app
 from app.database.models import Base
@@ -25,13 +24,12 @@ def event_loop() -> Generator:
     loop.close()
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 async def test_engine():
-    """Create test database engine."""
+    """Create test database engine and schema once per session."""
     engine = create_async_engine(
         TEST_DATABASE_URL,
         echo=False,
-        poolclass=NullPool,
     )
 
     # Create tables
@@ -49,19 +47,34 @@ async def test_engine():
 
 @pytest.fixture(scope="function")
 async def test_db(test_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create test database session."""
-    TestSessionLocal = async_sessionmaker(
-        test_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
+    """Create test database session rolled back after each test.
+
+    Commits made by the code under test only release a savepoint, so the
+    outer transaction rollback leaves the shared schema empty for the next test.
+    """
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
 
-    async with TestSessionLocal() as session:
-        yield session
+
+@pytest.fixture(scope="session")
+def asgi_transport() -> ASGITransport:
+    """Create an in-process ASGI transport shared by all test clients."""
+    return ASGITransport(app=app)
 
 
 @pytest.fixture(scope="function")
-async def client(test_db) -> AsyncGenerator[AsyncClient, None]:
+async def client(test_db, asgi_transport) -> AsyncGenerator[AsyncClient, None]:
     """Create test HTTP client."""
 
     async def override_get_db():
@@ -69,7 +82,7 @@ async def client(test_db) -> AsyncGenerator[AsyncClient, None]:
 
     app.dependency_overrides[get_db] = override_get_db
 
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=asgi_transport, base_url="http://test") as ac:
         yield ac
 
     app.dependency_overrides.clear()
@@ -37,6 +37,33 @@ class TestCostTracker:
         # Expected: (1000/1000 * 0.015) + (500/1000 * 0.075) = 0.015 + 0.0375 = 0.0525
         assert cost == 0.0525
 
+    def test_calculate_cost_with_cached_input(self):
+        """Test that prompt-cache reads and writes use their own rates."""
+        cost = CostTracker.calculate_cost(
+            model="claude-3-sonnet-20240229",
+            input_tokens=1000,
+            output_tokens=500,
+            cached_input_tokens=2000,
+            cache_write_tokens=1000,
+        )
+        # Expected: 0.003 + 0.0075 + (2000/1000 * 0.0003) + (1000/1000 * 0.00375) = 0.01485
+        assert cost == pytest.approx(0.01485)
+
+    def test_calculate_cost_cache_rate_override(self, monkeypatch):
+        """Test that an explicit cached_input rate overrides the default multiplier."""
+        monkeypatch.setitem(
+            CostTracker.PRICING,
+            "gpt-4",
+            {"input": 0.03, "output": 0.06, "cached_input": 0.015},
+        )
+        cost = CostTracker.calculate_cost(
+            model="gpt-4",
+            input_tokens=0,
+            output_tokens=0,
+            cached_input_tokens=1000,
+        )
+        assert cost == pytest.approx(0.015)
+
     def test_unknown_model_returns_zero(self):
         """Test that unknown models return zero cost."""
         cost = CostTracker.calculate_cost(
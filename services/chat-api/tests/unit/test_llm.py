@@ -0,0 +1,93 @@
+"""Tests for LLM service helpers."""
+
+import json
+
+import httpx
+from openai import AsyncAzureOpenAI
+
+from app.services.llm import LLMService, split_system_message
+
+
+class TestSplitSystemMessage:
+    """Test Anthropic message conversion."""
+
+    def test_extracts_first_system_message(self):
+        """Test the first system message becomes the prompt and others are dropped."""
+        messages = [
+            {"role": "system", "content": "be brief"},
+            {"role": "user", "content": "hi"},
+            {"role": "system", "content": "ignored"},
+            {"role": "assistant", "content": "hello", "name": "bot"},
+        ]
+
+        system_message, anthropic_messages = split_system_message(messages)
+
+        assert system_message == "be brief"
+        assert anthropic_messages == [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "hello"},
+        ]
+        assert len(messages) == 4
+
+    def test_passes_plain_messages_through(self):
+        """Test messages without a system prompt are returned without copying."""
+        messages = [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "hello"},
+        ]
+
+        system_message, anthropic_messages = split_system_message(messages)
+
+        assert system_message is None
+        assert anthropic_messages is messages
+
+
+def _sse(*events):
+    return "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+
+
+def _chunk(choices, **extra):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-4",
+        "choices": choices,
+        **extra,
+    }
+
+
+class TestAzureStream:
+    """Test Azure OpenAI streaming."""
+
+    async def test_skips_chunks_without_choices(self):
+        """Test prompt filter and usage chunks with empty choices are ignored."""
+        body = _sse(
+            _chunk([], prompt_filter_results=[{"prompt_index": 0, "content_filter_results": {}}]),
+            _chunk([{"index": 0, "delta": {"role": "assistant", "content": "Hel"}}]),
+            _chunk([{"index": 0, "delta": {"content": "lo"}, "finish_reason": "stop"}]),
+            _chunk([], usage={"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}),
+        )
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, text=body, headers={"content-type": "text/event-stream"}
+            )
+
+        service = LLMService()
+        service.azure_client = AsyncAzureOpenAI(
+            api_key="test",
+            azure_endpoint="https://example.openai.azure.com",
+            api_version="2024-02-01",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+        chunks = [
+            chunk async for chunk in service._azure_openai_stream(
+                [{"role": "user", "content": "hi"}], "gpt-4", 0.7, 16
+            )
+        ]
+
+        assert [c.content for c in chunks if not c.done] == ["Hel", "lo"]
+        assert chunks[-1].done
+        assert chunks[-1].meta["total_content"] == "Hello"
@@ -0,0 +1,185 @@
+"""Tests for batch chat completions."""
+
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+from app.services.llm import ChatResult
+from app.services.llm_batch import LLMBatchProcessor
+from app.services.rate_limit import TokenBucket
+
+
+def _openai_client(handler):
+    return AsyncOpenAI(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+def _anthropic_client(handler):
+    return AsyncAnthropic(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+def _chat_result(content="", provider="openai"):
+    return ChatResult(
+        content=content,
+        provider=provider,
+        model="gpt-4",
+        prompt_tokens=1,
+        completion_tokens=1,
+        total_tokens=2,
+        cost_usd=0.0,
+        latency_ms=1,
+        finish_reason="stop",
+    )
+
+
+def _service(openai_client=None, anthropic_client=None, chat_completion=None):
+    return SimpleNamespace(
+        openai_client=openai_client,
+        anthropic_client=anthropic_client,
+        chat_completion=chat_completion,
+    )
+
+
+class TestLLMBatchProcessor:
+    """Test batch chat completion paths."""
+
+    async def test_concurrent_fallback_preserves_order_and_errors(self):
+        """Test the non-batch path returns results in order and captures failures."""
+        async def chat_completion(messages, **kwargs):
+            if messages == "bad":
+                raise ValueError("boom")
+            return _chat_result(content=messages)
+
+        processor = LLMBatchProcessor(
+            _service(chat_completion=chat_completion), max_concurrency=2
+        )
+        results = await processor.batch_chat_completion(
+            [{"messages": "a"}, {"messages": "bad", "provider": "openai"}, {"messages": "c"}],
+            use_batch_api=False,
+        )
+
+        assert results[0]["content"] == "a"
+        assert results[1]["error"] == "boom"
+        assert results[1]["provider"] == "openai"
+        assert results[2]["content"] == "c"
+
+    async def test_openai_batch(self):
+        """Test requests are uploaded, polled and parsed from the output file."""
+        uploaded = {}
+        polls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            path = request.url.path
+            if path == "/v1/files":
+                uploaded["body"] = request.content
+                return httpx.Response(200, json={"id": "file-in", "object": "file"})
+            if path == "/v1/batches":
+                assert json.loads(request.content)["input_file_id"] == "file-in"
+                return httpx.Response(200, json={"id": "batch-1"})
+            if path == "/v1/batches/batch-1":
+                polls.append(1)
+                status = "completed" if len(polls) > 1 else "in_progress"
+                return httpx.Response(200, json={"status": status, "output_file_id": "file-out"})
+            if path == "/v1/files/file-out/content":
+                line = {
+                    "custom_id": "0",
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{"message": {"content": "hi"}, "finish_reason": "stop"}],
+                            "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500},
+                        },
+                    },
+                }
+                return httpx.Response(200, text=json.dumps(line))
+            raise AssertionError(f"unexpected request {path}")
+
+        processor = LLMBatchProcessor(
+            _service(openai_client=_openai_client(handler)), poll_interval=0.001
+        )
+        results = await processor.batch_chat_completion([
+            {"messages": [{"role": "user", "content": "x"}], "provider": "openai", "model": "gpt-4"},
+            {"messages": [{"role": "user", "content": "y"}], "provider": "openai", "model": "gpt-4"},
+        ])
+
+        assert b'"custom_id": "1"' in uploaded["body"]
+        assert len(polls) == 2
+        assert results[0]["content"] == "hi"
+        assert results[0]["batch_id"] == "batch-1"
+        # Half of (1000/1000 * 0.03) + (500/1000 * 0.06)
+        assert results[0]["cost_usd"] == pytest.approx(0.03)
+        assert "error" in results[1]
+
+    async def test_anthropic_batch(self):
+        """Test system messages are split out and results read from results_url."""
+        submitted = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            path = request.url.path
+            if path == "/v1/messages/batches" and request.method == "POST":
+                submitted.update(json.loads(request.content))
+                return httpx.Response(200, json={"id": "msgbatch-1"})
+            if path == "/v1/messages/batches/msgbatch-1":
+                return httpx.Response(200, json={
+                    "processing_status": "ended",
+                    "results_url": "https://api.anthropic.com/v1/messages/batches/msgbatch-1/results",
+                })
+            if path == "/v1/messages/batches/msgbatch-1/results":
+                line = {
+                    "custom_id": "0",
+                    "result": {
+                        "type": "succeeded",
+                        "message": {
+                            "content": [{"type": "text", "text": "yo"}],
+                            "stop_reason": "end_turn",
+                            "usage": {"input_tokens": 10, "output_tokens": 5},
+                        },
+                    },
+                }
+                return httpx.Response(200, text=json.dumps(line))
+            raise AssertionError(f"unexpected request {path}")
+
+        processor = LLMBatchProcessor(_service(anthropic_client=_anthropic_client(handler)))
+        results = await processor.batch_chat_completion([{
+            "messages": [
+                {"role": "system", "content": "be brief"},
+                {"role": "user", "content": "x"},
+            ],
+            "provider": "anthropic",
+        }])
+
+        params = submitted["requests"][0]["params"]
+        assert params["system"] == "be brief"
+        assert params["messages"] == [{"role": "user", "content": "x"}]
+        assert results[0]["content"] == "yo"
+        assert results[0]["total_tokens"] == 15
+
+    async def test_unconfigured_provider_falls_back_to_concurrent(self):
+        """Test providers without a configured batch client use chat_completion."""
+        async def chat_completion(**kwargs):
+            return _chat_result(provider=kwargs["provider"])
+
+        processor = LLMBatchProcessor(_service(chat_completion=chat_completion))
+        results = await processor.batch_chat_completion(
+            [{"messages": [], "provider": "azure_openai"}]
+        )
+
+        assert len(results) == 1
+        assert results[0]["provider"] == "azure_openai"
+
+
+async def test_token_bucket_allows_burst():
+    """Test a full bucket hands out its capacity without waiting."""
+    bucket = TokenBucket(requests_per_minute=3)
+    for _ in range(3):
+        await bucket.acquire()
+    assert bucket.tokens < 1